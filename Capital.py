@@ -1,13 +1,23 @@
-import json
+import sys
+import time
 import pygame
 
 import random
 
 import src.Board as Board
+from src.Pool import PuzzlePool
+from src.Cache import SolutionCache
+from src.Analysis import AnalysisWorker
+from src.Renderer import BoardRenderer, rasterize_board
+from src.Geometry import BoardGeometry
+from src.Tracker import CapitalTracker
+from src.Profiler import FrameProfiler
+from src.Store import BoardStore
 
 import src.Palette as palette
 import src.Constants as constants
 from src.Button import Button
+from src.Fonts import get_font
 
 
 class Capital:
@@ -15,12 +25,27 @@ class Capital:
     WIDTH, HEIGHT = 1000, 800
     BOARD_SIZE = 600
     FPS = 60
+    IDLE_TIMEOUT = 1000
+    CUSTOM_PAGE_SIZE = 22
 
-    def __init__(self):
+    def __init__(self, schedule: int = constants.FIXED_RATE, profile_path: str = None):
         # Create window
         
         pygame.init()
         
+        # Either draw every frame or only after something happened
+        
+        self.schedule = schedule
+        self.frame_stats = {"frames": 0, "wakeups": 0, "busy": 0.0, "idle": 0.0}
+        
+        # Time every phase and solver run to export to 'profile_path' if it is set, F3 shows the times
+        
+        self.profile_path = profile_path
+        self.profiler = FrameProfiler(enabled=profile_path is not None)
+        self.show_profiler = False
+        if profile_path is not None:
+            Board.solver_timer = self.profiler.record_solver
+        
         self.win = pygame.display.set_mode((Capital.WIDTH, Capital.HEIGHT))
         self.clock = pygame.time.Clock()
         
@@ -32,38 +57,45 @@ class Capital:
         self.custom_button = Button("Custom", 400, 550, 200, 50)
         
         self.custom_buttons = []
+        self.custom_page_buttons = []
         self.workshop_buttons = []
         self.workshop_save_button = Button("Save", Capital.WIDTH - 250, 350, 150, 50)
         
         # Initialize variables
         
         self.board_surf = pygame.Surface((Capital.BOARD_SIZE, Capital.BOARD_SIZE))
+        self.board_renderer = None
+        self.dirty_rects = []
+        self.update_rects = None
+        self.drawn_screen = None
         self.board = None
         self.marked_board = None
         self.initial_type = None
-        self.valid = False
-        self.found_capitals = 0
         self.success = False
         self.restart_delay = 0
         self.screen = constants.HOME
-        self.font = pygame.font.SysFont("monospaced", 80)
+        self.font = get_font("monospaced", 80)
         self.workshop_city = 1
-        self.workshop_solutions = 0
-        
-        # Handle file for saved custom boards
-        
-        try:
-            # Create custom-boards.json if it does not exist
-            with open("data/custom-boards.json", "x") as file:
-                json.dump([], file)
-                self.custom_boards = []
-        except FileExistsError:
-            # If it does, import custom boards 
-            try:
-                with open("data/custom-boards.json", "r") as file:
-                    self.custom_boards = json.load(file)
-            except:
-                self.custom_boards = []
+        self.custom_page = 0
+        self.custom_indices = range(0)
+        self.custom_previews = {}
+        
+        # Count workshop solutions without blocking the window
+        
+        self.analysis_event = pygame.event.custom_type()
+        self.analysis_worker = AnalysisWorker(lambda: pygame.event.post(pygame.event.Event(self.analysis_event)))
+        
+        # Create boards in the background so games start instantly
+        
+        self.puzzle_pool = PuzzlePool()
+        
+        # Remember solution counts between launches
+        
+        Board.solution_cache = SolutionCache(path="data/solution-cache.json")
+        
+        # Saved custom boards, moved over from the old JSON file the first time
+        
+        self.custom_boards = BoardStore("data/custom-boards.log", legacy_path="data/custom-boards.json")
         
     def loop(self) -> None:
         """ Main loop for Capital.
@@ -72,49 +104,163 @@ class Capital:
         self.running = True
         while self.running:
             
-            self.handle_events()
-                
-            # Handle updates
+            # Wait for something to happen before drawing in event driven mode
             
-            if self.screen == constants.HOME:
-                self.update_buttons()
-                
-            elif self.screen == constants.GAME:
-                self.update_game()
-                
-            elif self.screen == constants.CUSTOM:
-                self.update_custom()
-                
-            elif self.screen == constants.WORKSHOP:
-                self.update_workshop()
-
-            # Handle drawing
+            if self.schedule == constants.EVENT_DRIVEN:
+                events = self.wait_for_events()
+                if not events and not self.needs_frame():
+                    # Collect finished boards even while nobody touches the menu
+                    if self.screen == constants.HOME:
+                        self.puzzle_pool.refill()
+                    continue
+            else:
+                events = pygame.event.get()
             
-            if self.screen == constants.HOME:
-                self.draw_home_screen()
-                
-            elif self.screen == constants.GAME:
-                self.draw_game_screen()
-                
-                self.handle_success()
-                
-            elif self.screen == constants.CUSTOM:
-                self.draw_custom_screen()
-                
-            elif self.screen == constants.WORKSHOP:
-                self.draw_workshop_screen()
+            frame_start = time.perf_counter()
+            self.profiler.begin_frame()
+            
+            self.handle_events(events)
+            self.profiler.mark("events")
+            self.update_screen()
+            self.profiler.mark("update")
+            self.draw_screen()
+            if self.show_profiler:
+                self.draw_profiler()
+            self.profiler.mark("draw")
+            self.refresh_display()
+            self.profiler.mark("flip")
+            
+            self.profiler.end_frame(self.drawn_screen)
+            self.frame_stats["frames"] += 1
+            self.frame_stats["busy"] += time.perf_counter() - frame_start
             
-            # Refresh the screen
+            if self.schedule == constants.FIXED_RATE:
+                idle_start = time.perf_counter()
+                self.clock.tick(Capital.FPS)
+                self.frame_stats["idle"] += time.perf_counter() - idle_start
             
+        # Keep the leftover boards for next time
+        
+        self.puzzle_pool.close()
+        self.analysis_worker.close()
+        self.custom_boards.close()
+        Board.solution_cache.save()
+        
+        if self.profile_path is not None:
+            self.profiler.export(self.profile_path)
+        
+    def update_screen(self) -> None:
+        """ Update the buttons and board of the current screen.
+        """
+        
+        # Only create boards in the background while on the menu
+        
+        if self.screen != constants.HOME:
+            self.puzzle_pool.pause()
+            
+        if self.screen == constants.HOME:
+            self.update_buttons()
+            self.puzzle_pool.refill()
+            
+        elif self.screen == constants.GAME:
+            self.update_game()
+            
+        elif self.screen == constants.CUSTOM:
+            self.update_custom()
+            
+        elif self.screen == constants.WORKSHOP:
+            self.update_workshop()
+    
+    
+    def draw_screen(self) -> None:
+        """ Draw the current screen onto the window, setting 'update_rects' if only part of it changed.
+        """
+        
+        self.update_rects = None
+        drawing = self.screen
+        
+        if self.screen == constants.HOME:
+            self.draw_home_screen()
+            
+        elif self.screen == constants.GAME:
+            self.draw_game_screen()
+            
+            self.handle_success()
+            
+        elif self.screen == constants.CUSTOM:
+            self.draw_custom_screen()
+            
+        elif self.screen == constants.WORKSHOP:
+            self.draw_workshop_screen()
+            
+        self.drawn_screen = drawing
+    
+    
+    def refresh_display(self) -> None:
+        """ Show what was drawn, only where it changed if the screen knows.
+        """
+        
+        if self.update_rects is None:
             pygame.display.update()
-            self.clock.tick(Capital.FPS)
+        else:
+            pygame.display.update(self.update_rects)
+    
+    
+    def draw_profiler(self) -> None:
+        """ Draw the profiler's overlay on top of the screen, refreshing its area too if only part of the screen changed.
+        """
+        
+        rect = self.profiler.draw(self.win)
+        if self.update_rects is not None:
+            self.update_rects.append(rect)
+    
+    
+    def wait_for_events(self) -> list[pygame.event.Event]:
+        """ Sleep until there is an event or 'IDLE_TIMEOUT' milliseconds pass and return the events,
+        without sleeping at all if the next frame is already needed.
+        """
+        
+        idle_start = time.perf_counter()
+        
+        if self.needs_frame():
+            events = pygame.event.get()
+        else:
+            event = pygame.event.wait(Capital.IDLE_TIMEOUT)
+            events = [] if event.type == pygame.NOEVENT else [event] + pygame.event.get()
+            
+        self.frame_stats["wakeups"] += 1
+        self.frame_stats["idle"] += time.perf_counter() - idle_start
+        return events
+    
+    
+    def needs_frame(self) -> bool:
+        """ Return True if a frame has to be drawn even without any new events.
+        """
         
-    def handle_events(self) -> None:
-        """ Handle mouse interactions.
+        # A new screen has not been drawn yet, or a won game still has to show it and end
+        return self.drawn_screen != self.screen or (self.success and self.screen == constants.GAME)
+    
+    
+    def get_frame_stats(self) -> dict[str, int | float]:
+        """ Return the amount of frames drawn and times woken up along with how long was spent drawing and idling.
+        """
+        
+        frames = self.frame_stats["frames"]
+        total = self.frame_stats["busy"] + self.frame_stats["idle"]
+        return {
+            "frames": frames,
+            "wakeups": self.frame_stats["wakeups"],
+            "busy_ms_per_frame": 1000*self.frame_stats["busy"] / frames if frames else 0.0,
+            "idle_fraction": self.frame_stats["idle"] / total if total else 0.0,
+        }
+    
+    
+    def handle_events(self, events: list[pygame.event.Event]) -> None:
+        """ Handle mouse interactions in 'events'.
         """
         
         self.mouse_pos = pygame.mouse.get_pos()
-        for event in pygame.event.get():
+        for event in events:
             
             # Exit the application
             
@@ -124,17 +270,23 @@ class Capital:
             # Main menu
             
             elif event.type == pygame.KEYDOWN:
-                self.screen = constants.HOME
+                # F3 shows or hides the profiler while profiling, drawing the whole screen again to clear it
+                if event.key == pygame.K_F3 and self.profiler.enabled:
+                    self.show_profiler = not self.show_profiler
+                    self.drawn_screen = None
+                else:
+                    self.screen = constants.HOME
                 
             # Hover over spaces
             
             elif event.type == pygame.MOUSEMOTION:
+                previous_pos = (event.pos[0] - event.rel[0], event.pos[1] - event.rel[1])
+                
                 if self.screen == constants.GAME:
-                    self.drag_crosses()
+                    self.drag_crosses(previous_pos, event.pos)
                     
                 elif pygame.mouse.get_pressed()[0] and self.screen == constants.WORKSHOP:
-                    self.interact_with_workshop()
-                    self.workshop_solutions = Board.get_solutions(self.board)
+                    self.interact_with_workshop(previous_pos, event.pos)
             
             # Click spaces
             
@@ -144,7 +296,12 @@ class Capital:
                     
                 elif self.screen == constants.WORKSHOP:
                     self.interact_with_workshop()
-                    self.workshop_solutions = Board.get_solutions(self.board)
+            
+            # Scroll through saved boards
+            
+            elif event.type == pygame.MOUSEWHEEL:
+                if self.screen == constants.CUSTOM:
+                    self.turn_custom_page(-event.y)
             
             # Click buttons
             
@@ -175,18 +332,24 @@ class Capital:
                     if self.custom_buttons[0].pressed:
                         self.start_game(None, Board.create_board(5))
                         self.screen = constants.WORKSHOP
+                        self.analysis_worker.submit(self.board)
                         
                         self.create_workshop()
                         
-                    for i in range(0, len(self.custom_boards)):
+                    elif self.custom_page_buttons[0].pressed:
+                        self.turn_custom_page(-1)
+                        
+                    elif self.custom_page_buttons[1].pressed:
+                        self.turn_custom_page(1)
+                        
+                    for i, index in enumerate(self.custom_indices):
                         if self.custom_buttons[i + 1].pressed:
-                            self.start_game(None, self.custom_boards[i])
+                            self.start_game(None, self.custom_boards[index])
                             
                 elif self.screen == constants.WORKSHOP:
                     if self.workshop_save_button.pressed:
-                        self.custom_boards += [self.board]
-                        with open("data/custom-boards.json", 'w') as file:
-                            json.dump(self.custom_boards, file)
+                        self.custom_boards.append(self.board)
+                        self.custom_previews.pop(len(self.custom_boards) - 1, None)
                         self.screen = constants.CUSTOM
                         self.create_custom_screen()
                     
@@ -194,19 +357,19 @@ class Capital:
                         size = len(self.board)
                         if self.workshop_city == size:
                             self.workshop_city -= 1
-                        self.board = [[0 if size == square else square for square in row[:-1]] for row in self.board[:-1]]
+                        self.board = Board.shrink_board(self.board)
+                        self.analysis_worker.submit(self.board)
                         self.create_workshop()
                         
                     elif self.workshop_buttons[-1].pressed and len(self.board) < 15:
-                        self.board = [row + [0] for row in (self.board + [[0 for row in self.board]])]
+                        self.board = Board.grow_board(self.board)
+                        self.analysis_worker.submit(self.board)
                         self.create_workshop()
                         
                     else:
                         for i in range(1, len(self.board) + 1):
                             if self.workshop_buttons[i].pressed:
                                 self.workshop_city = i
-                                
-                    self.workshop_solutions = Board.get_solutions(self.board)
                         
 
     def update_buttons(self) -> None:
@@ -219,54 +382,50 @@ class Capital:
         self.custom_button.update(*self.mouse_pos)
 
 
-    def start_game(self, board_size: int = None, board: list[list[int]] = None) -> None:
+    def start_game(self, board_size: int = None, board: Board.Board = None) -> None:
         """ Create a new board and change the screen to constants.GAME.
         """
         
-        self.board_surf = pygame.Surface((Capital.BOARD_SIZE, Capital.BOARD_SIZE))
-        
         if board_size != None:
-            # Create new board
-            self.board = Board.create_single_solution_board(board_size)
+            # Take a ready board, only creating one if the pool ran out,
+            # by repairing a board which is quick enough to not freeze the window
+            self.board = (self.puzzle_pool.pop(board_size) or
+                          Board.create_single_solution_board(board_size, repair=True, caller="start_game"))
         else:
             self.board = board
             
         self.screen = constants.GAME
-        self.marked_board = [[0 for i in range(len(self.board))] for j in range(len(self.board))]
+        self.marked_board = Board.Board(len(self.board))
+        self.capitals = CapitalTracker(self.board)
         
-        # Create variables and surfaces
+        # Draw the new board in full on the next frame
         
-        self.square_size = Capital.BOARD_SIZE / len(self.board)
-        self.highlight = pygame.Surface((self.square_size, self.square_size), pygame.SRCALPHA)
-        self.highlight.fill((255, 255, 255, 100))
+        self.board_renderer = BoardRenderer(self.board, Capital.BOARD_SIZE)
+        self.drawn_screen = None
+        
+        # Map the mouse to squares of the new board
+        
+        self.geometry = BoardGeometry(self.get_board_x(), self.get_board_y(), Capital.BOARD_SIZE, len(self.board))
 
 
-    def drag_crosses(self) -> None:
-        """ Change the state of all spaces dragged over to the opposite of the inital space's state.
+    def drag_crosses(self, start: tuple[int, int], end: tuple[int, int]) -> None:
+        """ Change the state of all spaces dragged over from 'start' to 'end' to the opposite of the inital space's state.
         """
         
         # Must have started right clicking over the board
         if self.initial_type == None or not pygame.mouse.get_pressed()[2]:
             return
         
-        for row in range(len(self.board)):
-            for column in range(len(self.board)):
-                
-                # Only alter spaces with the same state as the one initially clicked
-                
-                if self.marked_board[row][column] != self.initial_type:
-                    continue
-                
-                # Swap X's with Empty spaces and vise versa
-                
-                x = self.square_size*column + self.get_board_x()
-                y = self.square_size*row + self.get_board_y()
-                
-                OVER_SPACE = (0 < self.mouse_pos[0] - x < self.square_size and
-                              0 < self.mouse_pos[1] - y < self.square_size)
-                
-                if OVER_SPACE:
-                    self.marked_board[row][column] = 1 - self.initial_type
+        for column, row in self.geometry.get_squares_between(start, end):
+            
+            # Only alter spaces with the same state as the one initially clicked
+            
+            if self.marked_board[row][column] != self.initial_type:
+                continue
+            
+            # Swap X's with Empty spaces and vise versa
+            
+            self.set_mark(column, row, 1 - self.initial_type)
 
 
     def interact_with_the_board(self) -> None:
@@ -274,35 +433,38 @@ class Capital:
         """
         
         self.initial_type = None
-        for row in range(len(self.board)):
-            for column in range(len(self.board)):
-                
-                x = self.square_size*column + self.get_board_x()
-                y = self.square_size*row + self.get_board_y()
-                
-                OVER_SPACE = (0 < self.mouse_pos[0] - x < self.square_size and
-                              0 < self.mouse_pos[1] - y < self.square_size)
-                
-                if not OVER_SPACE:
-                    continue
-                
-                # Left click: Add / remove capital
-                
-                if pygame.mouse.get_pressed()[0]:
-                    self.marked_board[row][column] = 2 - self.marked_board[row][column]
-                    continue
-                
-                # Right click: Add / remove X
-                
-                if pygame.mouse.get_pressed()[2]:
-                    if self.marked_board[row][column] == 2:
-                        return
-                    self.initial_type = self.marked_board[row][column]
-                    self.marked_board[row][column] = 1 - self.initial_type
-                
-                # Break loop since only one square can be hovered
-                
+        square = self.geometry.get_square(*self.mouse_pos)
+        if square is None:
+            return
+        
+        column, row = square
+        
+        # Left click: Add / remove capital
+        
+        if pygame.mouse.get_pressed()[0]:
+            self.set_mark(column, row, 2 - self.marked_board[row][column])
+            return
+        
+        # Right click: Add / remove X
+        
+        if pygame.mouse.get_pressed()[2]:
+            if self.marked_board[row][column] == 2:
                 return
+            self.initial_type = self.marked_board[row][column]
+            self.set_mark(column, row, 1 - self.initial_type)
+            
+            
+    def set_mark(self, column: int, row: int, mark: int) -> None:
+        """ Change the mark on 'column' and 'row' to 'mark', only checking the capitals it affects.
+        """
+        
+        if self.marked_board[row][column] == 2:
+            self.capitals.remove(column, row)
+        
+        self.marked_board[row][column] = mark
+        
+        if mark == 2:
+            self.capitals.place(column, row)
             
                     
     def get_board_x(self) -> int:
@@ -320,118 +482,31 @@ class Capital:
                     
                     
     def update_game(self) -> None:
-        """ Draw all game elements on 'board_surf'.
+        """ Redraw the squares of the game board whose highlight or marks changed.
         """
         
-        self.valid = False
-        self.found_capitals = 0
+        hovered = self.geometry.get_square(*self.mouse_pos)
+        states = []
         for row in range(len(self.board)):
+            states.append([])
             for column in range(len(self.board)):
                 
-                x = self.square_size*column
-                y = self.square_size*row
-                
-                # Draw square
+                OVER_SPACE = hovered == (column, row)
                 
-                pygame.draw.rect(self.board_surf, palette.board_colors[self.board[row][column] - 1],
-                                (x, y, self.square_size, self.square_size))
+                # Colour capitals by whether they are valid
                 
-                OVER_SPACE = (0 < self.mouse_pos[0] - self.get_board_x() - x < self.square_size and
-                              0 < self.mouse_pos[1] - self.get_board_y() - y < self.square_size)
+                color = None
+                if self.marked_board[row][column] == 2:
+                    if (column, row) in self.capitals.valid:
+                        color = palette.success if self.success else palette.board_border
+                    else:
+                        color = palette.invalid
                 
                 # Highlight if hovered
                 
-                if OVER_SPACE or self.success:
-                    self.board_surf.blit(self.highlight, (x, y))
-                
-                # Draw border
+                states[row].append((OVER_SPACE or self.success, self.marked_board[row][column], color))
                 
-                pygame.draw.rect(self.board_surf, palette.board_border,
-                                (x, y, self.square_size + 1, self.square_size + 1), 2)
-                
-                self.draw_space_elements(column, row)
-
-
-    def draw_space_elements(self, column: int, row: int) -> None:
-        """ Draw X's and Capital Squares within the board 'column' and 'row'.
-        """
-                
-        x = self.square_size*column
-        y = self.square_size*row
-        
-        # Draw X
-        
-        if self.marked_board[row][column] == 1:
-            pygame.draw.line(self.board_surf, palette.board_border,
-                            (x + self.square_size/6, y + self.square_size/6),
-                            (x + self.square_size*5/6, y + self.square_size*5/6), 10)
-            pygame.draw.line(self.board_surf, palette.board_border,
-                            (x + self.square_size*5/6, y + self.square_size/6),
-                            (x + self.square_size/6, y + self.square_size*5/6), 10)
-            return
-            
-        if self.marked_board[row][column] != 2:
-            return
-        
-        # Draw Capital and validate capital
-        
-        if self.validate_space(column, row):
-            self.valid = True
-            color = palette.success if self.success else palette.board_border
-            self.found_capitals += 1
-        else:
-            color = palette.invalid
-        
-        pygame.draw.rect(self.board_surf, color,
-                         (x + self.square_size/6, y + self.square_size/6,
-                          self.square_size*2/3, self.square_size*2/3), 10)
-
-
-    def validate_space(self, column: int, row: int) -> bool:
-        """ Return True if no other capitals interfere with the
-        capital on column and row: 'column' and 'row'.
-        """
-        
-        # Vertical: No capitals can be in the same column.
-        
-        for i in range(len(self.board)):
-            if i == row:
-                continue
-            if self.marked_board[i][column] == 2:
-                return False
-            
-        # Horizontal: No capitals can be in the same row.
-        
-        for i in range(len(self.board)):
-            if i == column:
-                continue
-            if self.marked_board[row][i] == 2:
-                return False
-            
-        # Surrounding: No capitals can be touching.
-        
-        for r in [-1, 1]:
-            if not (0 <= row + r < len(self.board)):
-                continue
-            for c in [-1, 1]:
-                if not (0 <= column + c < len(self.board)):
-                    continue
-                if self.marked_board[row + r][column + c] == 2:
-                    return False
-            
-        # City: No other capital can be in the same city (color)
-        
-        for r in range(len(self.board)):
-            if r == row:
-                continue
-            for c in range(len(self.board)):
-                if c == column:
-                    continue
-                if (self.marked_board[r][c] == 2 and
-                    self.board[r][c] == self.board[row][column]):
-                    return False
-                
-        return True
+        self.dirty_rects = self.board_renderer.update(states)
 
 
     def restart(self) -> None:
@@ -446,8 +521,6 @@ class Capital:
         self.board = None
         self.marked_board = None
         self.initial_type = None
-        self.valid = False
-        self.found_capitals = 0
         self.success = False
         self.restart_delay = 0
         
@@ -464,7 +537,7 @@ class Capital:
             
         # End game if the board is filled and the capitals are in the right place
             
-        if self.valid and self.found_capitals == len(self.board):
+        if self.capitals.is_solved():
             self.success = True
             
             
@@ -472,32 +545,40 @@ class Capital:
         
         square_size = Capital.BOARD_SIZE / 2 / len(self.board)
         
-        for row in range(len(self.board)):
-            for column in range(len(self.board)):
-                
-                x = square_size*column
-                y = square_size*row
-                
-                # Draw square
-                
-                pygame.draw.rect(self.board_surf, palette.board_colors[self.board[row][column] - 1],
-                                (x, y, square_size + 1, square_size + 1))
-                
-                boardx = (Capital.WIDTH - Capital.BOARD_SIZE/2) / 2
-                boardy = (Capital.HEIGHT - Capital.BOARD_SIZE/2) / 3
-                
-                OVER_SPACE = (0 < self.mouse_pos[0] - boardx - x < square_size and
-                              0 < self.mouse_pos[1] - boardy - y < square_size)
-                
-                # Highlight if hovered
-                
-                if OVER_SPACE or self.success:
-                    self.board_surf.blit(self.highlight, (x, y))
-                
-                # Draw border
-                
-                pygame.draw.rect(self.board_surf, palette.board_border,
-                                (x, y, self.square_size + 1, self.square_size + 1), 2)
+        # Only use a heatmap made for a board this size
+        
+        result = self.analysis_worker.result
+        heatmap = result.heatmap if result and result.solutions and len(result.heatmap) == len(self.board) else None
+        
+        # Draw squares and borders
+        
+        self.board_surf.blit(rasterize_board(self.board, self.board_surf.get_width()), (0, 0))
+        
+        hovered = self.workshop_geometry.get_square(*self.mouse_pos)
+        
+        # Highlight the hovered square, or every square once solved
+        
+        if self.success:
+            highlighted = [(column, row) for row in range(len(self.board)) for column in range(len(self.board))]
+        else:
+            highlighted = [hovered] if hovered else []
+            
+        for column, row in highlighted:
+            x = square_size*column
+            y = square_size*row
+            self.board_surf.blit(self.workshop_highlight, (x, y))
+            pygame.draw.rect(self.board_surf, palette.board_border,
+                            (x, y, square_size + 1, square_size + 1), 2)
+            
+        # Draw how often solutions place a capital here
+        
+        if heatmap:
+            for row in range(len(self.board)):
+                for column in range(len(self.board)):
+                    if heatmap[row][column]:
+                        pygame.draw.circle(self.board_surf, palette.board_border,
+                                           (square_size*(column + 0.5), square_size*(row + 0.5)),
+                                           square_size/3 * heatmap[row][column] / result.solutions)
         
         
     def draw_home_screen(self) -> None:
@@ -514,12 +595,20 @@ class Capital:
         
     
     def draw_game_screen(self) -> None:
-        """ Draw background and board.
+        """ Draw background and board, only copying the squares that changed after the first frame.
         """
         
-        self.win.fill(palette.background)
-        self.win.blit(self.board_surf, ((Capital.WIDTH - Capital.BOARD_SIZE) / 2,
-                                        (Capital.HEIGHT - Capital.BOARD_SIZE) / 2))
+        board_x, board_y = int(self.get_board_x()), int(self.get_board_y())
+        
+        if self.drawn_screen != constants.GAME:
+            self.win.fill(palette.background)
+            self.win.blit(self.board_renderer.surf, (board_x, board_y))
+            return
+        
+        self.update_rects = []
+        for rect in self.dirty_rects:
+            self.win.blit(self.board_renderer.surf, (board_x + rect.x, board_y + rect.y), rect)
+            self.update_rects.append(rect.move(board_x, board_y))
         
         
     def create_custom_screen(self) -> None:
@@ -533,9 +622,15 @@ class Capital:
         
         self.custom_buttons.append(Button("+", marginx + pad, marginy + pad, button_size, button_size))
         
+        # Only create buttons for the boards on the current page
+        
+        self.custom_page = max(0, min(self.custom_page, self.get_custom_page_count() - 1))
+        first = self.custom_page*Capital.CUSTOM_PAGE_SIZE
+        self.custom_indices = range(first, min(first + Capital.CUSTOM_PAGE_SIZE, len(self.custom_boards)))
+        
         column = 1
         row = 0
-        for _ in self.custom_boards:
+        for _ in self.custom_indices:
             self.custom_buttons.append(Button("", marginx + (button_size + pad)*column + pad,
                                               marginy + (button_size + pad)*row + pad, button_size, button_size))
             
@@ -543,11 +638,52 @@ class Capital:
             if column > 5 or (row == 0 and column > 4):
                 column = 0
                 row += 1
+        
+        self.custom_page_buttons = [
+            Button("<", marginx, self.HEIGHT - marginy + 10, button_size, 50),
+            Button(">", self.WIDTH - marginx - button_size, self.HEIGHT - marginy + 10, button_size, 50)
+        ]
+        
+        
+    def get_custom_page_count(self) -> int:
+        """ Returns the amount of pages needed to show every saved board, at least 1.
+        """
+        
+        return max(1, -(-len(self.custom_boards) // Capital.CUSTOM_PAGE_SIZE))
+    
+    
+    def turn_custom_page(self, step: int) -> None:
+        """ Move 'step' pages through the saved boards, staying within the first and last page.
+        """
+        
+        page = max(0, min(self.custom_page + step, self.get_custom_page_count() - 1))
+        if page != self.custom_page:
+            self.custom_page = page
+            self.create_custom_screen()
+            
+            
+    def get_custom_preview(self, index: int, width: int) -> pygame.Surface:
+        """ Returns the preview of saved board 'index' for a button 'width' wide, only drawing it the first time.
+        """
+        
+        if index not in self.custom_previews:
+            board_size = len(self.custom_boards[index])
+            margin = width / (board_size + 2)
+            self.custom_previews[index] = rasterize_board(self.custom_boards[index], int(margin*board_size) + 1, grid=False)
+        
+        return self.custom_previews[index]
                 
                 
     def create_workshop(self) -> None:
         self.board_surf = pygame.Surface((Capital.BOARD_SIZE/2, Capital.BOARD_SIZE/2))
         
+        square_size = Capital.BOARD_SIZE / 2 / len(self.board)
+        self.workshop_geometry = BoardGeometry((Capital.WIDTH - Capital.BOARD_SIZE/2) / 2,
+                                               (Capital.HEIGHT - Capital.BOARD_SIZE/2) / 3,
+                                               Capital.BOARD_SIZE/2, len(self.board))
+        self.workshop_highlight = pygame.Surface((square_size, square_size), pygame.SRCALPHA)
+        self.workshop_highlight.fill((255, 255, 255, 100))
+        
         marginx = self.WIDTH / 4
         marginy = self.HEIGHT * 3/4
         dist = self.WIDTH / 2 / len(self.board)
@@ -561,29 +697,32 @@ class Capital:
         self.workshop_buttons.insert(0, Button("-", marginx + button_size - dist - 100, marginy, 100, 100))
         self.workshop_buttons.append(Button("+", marginx + dist*len(self.board), marginy, 100, 100))
     
-    def interact_with_workshop(self) -> None:
-        square_size = Capital.BOARD_SIZE / 2 / len(self.board)
+    def interact_with_workshop(self, previous_pos: tuple[int, int] = None, pos: tuple[int, int] = None) -> None:
+        """ Paint the square under the mouse, or at 'pos' if it is set, with the selected city
+        along with every square dragged over since 'previous_pos' if it is set.
+        """
         
-        for row in range(len(self.board)):
-            for column in range(len(self.board)):
-                
-                x = square_size*column
-                y = square_size*row
-                
-                boardx = (Capital.WIDTH - Capital.BOARD_SIZE/2) / 2
-                boardy = (Capital.HEIGHT - Capital.BOARD_SIZE/2) / 3
-                
-                OVER_SPACE = (0 < self.mouse_pos[0] - boardx - x < square_size and
-                              0 < self.mouse_pos[1] - boardy - y < square_size)
+        pos = pos or self.mouse_pos
+        if previous_pos is None:
+            square = self.workshop_geometry.get_square(*pos)
+            squares = [square] if square else []
+        else:
+            squares = self.workshop_geometry.get_squares_between(previous_pos, pos)
+            
+        changed = False
+        for column, row in squares:
+            if self.board[row][column] != self.workshop_city:
+                self.board[row][column] = self.workshop_city
+                changed = True
                 
-                if OVER_SPACE:
-                    self.board[row][column] = self.workshop_city
-                    return
-                    
+        # Only analyse the board again if it actually changed
+        
+        if changed:
+            self.analysis_worker.submit(self.board)
     
     
     def update_custom(self) -> None:
-        for custom_button in self.custom_buttons:
+        for custom_button in self.custom_buttons + self.custom_page_buttons:
             custom_button.update(*self.mouse_pos)
     
 
@@ -605,18 +744,18 @@ class Capital:
         
         # Draw add new custom board button
         self.custom_buttons[0].draw(self.win)
-        for i, custom_button in enumerate(self.custom_buttons[1:]):
+        for custom_button, index in zip(self.custom_buttons[1:], self.custom_indices):
             # Draw button
             custom_button.draw(self.win)
             # Draw preview
-            board_size = len(self.custom_boards[i])
-            for row in range(board_size):
-                for column in range(board_size):
-                    pygame.draw.rect(self.win, palette.board_colors[self.custom_boards[i][row][column] - 1], (
-                        custom_button.x_pos + (column + 1) * custom_button.surf.get_width()/(board_size + 2),
-                        custom_button.y_pos + (row + 1) * custom_button.surf.get_height()/(board_size + 2),
-                        custom_button.surf.get_width()/(board_size + 2) + 1,
-                        custom_button.surf.get_height()/(board_size + 2) + 1))
+            margin = custom_button.get_width() / (len(self.custom_boards[index]) + 2)
+            preview = self.get_custom_preview(index, custom_button.get_width())
+            self.win.blit(preview, (custom_button.x_pos + margin, custom_button.y_pos + margin))
+        
+        # Draw page buttons when the boards do not fit on one page
+        if self.get_custom_page_count() > 1:
+            for page_button in self.custom_page_buttons:
+                page_button.draw(self.win)
     
 
     def draw_workshop_screen(self) -> None:
@@ -633,9 +772,19 @@ class Capital:
         self.win.blit(self.board_surf, ((Capital.WIDTH - Capital.BOARD_SIZE/2) / 2,
                                         (Capital.HEIGHT - Capital.BOARD_SIZE/2) / 3))
         
-        solutions = self.font.render(str(self.workshop_solutions), True, '#ffffff')
-        self.win.blit(solutions, (Capital.WIDTH - 200, 250))
+        # Show the latest finished count, marking it while a newer one is on the way
+        
+        result = self.analysis_worker.result
+        if result is not None:
+            text = str(result.solutions) + ("..." if self.analysis_worker.is_stale() else "")
+            solutions = self.font.render(text, True, '#ffffff')
+            self.win.blit(solutions, (Capital.WIDTH - 200, 250))
                 
 
 if __name__ == "__main__":
-    Capital().loop()
+    capital = Capital(constants.EVENT_DRIVEN if "--event-driven" in sys.argv else constants.FIXED_RATE,
+                      "data/frame-profile.json" if "--profile" in sys.argv else None)
+    capital.loop()
+    
+    if "--stats" in sys.argv:
+        print(capital.get_frame_stats())
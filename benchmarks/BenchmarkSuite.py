@@ -0,0 +1,187 @@
+import sys
+import json
+import time
+import random
+import platform
+
+import src.Board as Board
+import src.Solver as Solver
+
+
+# Engines in 'Board.SOLVERS' that can count the search nodes they visit
+NODE_COUNTING_SOLVERS = {
+    "bitboard": Solver.bitboard_solutions,
+    "propagation": Solver.propagation_solutions,
+}
+
+
+def summarize(samples: list[float]) -> dict[str, float]:
+    """ Returns the median, 95th and 99th percentile, mean, minimum and maximum of 'samples'.
+    Percentiles use the nearest rank so they are always one of the samples.
+    """
+
+    ordered = sorted(samples)
+
+    def percentile(p: float) -> float:
+        return ordered[max(0, min(len(ordered) - 1, round(p/100*len(ordered) + 0.5) - 1))]
+
+    return {
+        "median": percentile(50),
+        "p95": percentile(95),
+        "p99": percentile(99),
+        "mean": sum(ordered) / len(ordered),
+        "min": ordered[0],
+        "max": ordered[-1],
+        "samples": len(ordered),
+    }
+
+
+def time_call(function, *args, **kwargs) -> tuple[float, object]:
+    """ Returns the seconds 'function' takes to run with 'args' and 'kwargs', along with what it returned.
+    """
+
+    initial_time = time.perf_counter()
+    result = function(*args, **kwargs)
+    return time.perf_counter() - initial_time, result
+
+
+def count_nodes(solver: str, board: list[list[int]], cap: int) -> int | None:
+    """ Returns the search nodes 'solver' visits counting the solutions to 'board' stopping at 'cap',
+    or None if that engine cannot count them.
+    """
+
+    if solver not in NODE_COUNTING_SOLVERS:
+        return None
+
+    nodes = [0]
+    NODE_COUNTING_SOLVERS[solver](board, cap, nodes)
+    return nodes[0]
+
+
+def benchmark_size(size: int, repetitions: int, boards_per_size: int, seed: int) -> dict[str, dict]:
+    """ Returns timings for creating capitals, creating unique boards and counting solutions on boards
+    with 'size' rows and columns. Every stage reseeds from 'seed' and 'size' so it is the same on every run.
+    """
+
+    results = {}
+
+    # Random boards, the same ones the generator tries
+
+    random.seed(seed*1000 + size)
+    times = []
+    boards = []
+    for _ in range(repetitions):
+        board = Board.create_board(size)
+        elapsed, _ = time_call(Board.create_capitals, board)
+        times.append(elapsed)
+        boards.append(board)
+    results["create_capitals"] = {"seconds": summarize(times)}
+
+    # Unique boards, along with how many attempts each one took
+
+    random.seed(seed*1000 + size)
+    times = []
+    attempts = []
+    for _ in range(boards_per_size):
+        calls = [0]
+        elapsed, _ = time_call(Board.create_single_solution_board, size, calls=calls)
+        times.append(elapsed)
+        attempts.append(calls[0])
+    results["create_single_solution_board"] = {"seconds": summarize(times), "attempts": summarize(attempts)}
+
+    # Solving the random boards, timed through the public functions but counted on the engines behind them
+
+    for name, function, solver, cap in (("has_one_solutions", Board.has_one_solutions, Board.DEFAULT_UNIQUE_SOLVER, 2),
+                                        ("get_solutions", Board.get_solutions, Board.DEFAULT_SOLVER, 0)):
+        times = []
+        nodes = []
+        for board in boards:
+            elapsed, _ = time_call(function, board)
+            times.append(elapsed)
+            nodes.append(count_nodes(solver, board, cap))
+
+        results[name] = {"solver": solver, "seconds": summarize(times)}
+        if None not in nodes:
+            results[name]["nodes"] = summarize(nodes)
+
+    return results
+
+
+def run_suite(sizes: range = range(4, 16), repetitions: int = 100, boards_per_size: int = 5,
+              seed: int = 0, path: str = None) -> dict:
+    """ Benchmark the generator and solvers for every board size in 'sizes', using 'repetitions' random boards
+    and 'boards_per_size' unique boards per size, and print a summary. The full results are returned
+    and written as JSON to 'path' if it is set so runs can be compared with 'compare_results'.
+    """
+
+    # Every call has to do its own work
+    solution_cache = Board.solution_cache
+    Board.solution_cache = None
+
+    results = {
+        "meta": {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "sizes": list(sizes),
+            "repetitions": repetitions,
+            "boards_per_size": boards_per_size,
+            "seed": seed,
+        },
+        "sizes": {},
+    }
+
+    try:
+        print(f"{'size':>4} {'capitals p50':>13} {'unique p50':>11} {'unique p95':>11} {'attempts p50':>13}"
+              f" {'has_one p50':>12} {'has_one p99':>12} {'nodes p50':>10} {'get p50':>10} {'get p99':>10}")
+        for size in sizes:
+            stats = benchmark_size(size, repetitions, boards_per_size, seed)
+            results["sizes"][str(size)] = stats
+
+            print(f"{size:>4} {stats['create_capitals']['seconds']['median']*1000:>11.3f}ms"
+                  f" {stats['create_single_solution_board']['seconds']['median']:>10.2f}s"
+                  f" {stats['create_single_solution_board']['seconds']['p95']:>10.2f}s"
+                  f" {stats['create_single_solution_board']['attempts']['median']:>13}"
+                  f" {stats['has_one_solutions']['seconds']['median']*1000:>10.3f}ms"
+                  f" {stats['has_one_solutions']['seconds']['p99']*1000:>10.3f}ms"
+                  f" {stats['has_one_solutions'].get('nodes', {}).get('median', '-'):>10}"
+                  f" {stats['get_solutions']['seconds']['median']*1000:>8.3f}ms"
+                  f" {stats['get_solutions']['seconds']['p99']*1000:>8.3f}ms")
+            sys.stdout.flush()
+    finally:
+        Board.solution_cache = solution_cache
+
+    if path:
+        with open(path, "w") as file:
+            json.dump(results, file, indent=2)
+
+    return results
+
+
+def compare_results(old_path: str, new_path: str, statistic: str = "median") -> None:
+    """ Print how 'statistic' of every measurement changed from the results at 'old_path' to those at 'new_path',
+    as new divided by old, so values above 1 are regressions.
+    """
+
+    with open(old_path, "r") as file:
+        old = json.load(file)["sizes"]
+    with open(new_path, "r") as file:
+        new = json.load(file)["sizes"]
+
+    print(f"{'size':>4} {'benchmark':>30} {'metric':>8} {'old':>12} {'new':>12} {'ratio':>7}")
+    for size in sorted(set(old) & set(new), key=int):
+        for benchmark in sorted(set(old[size]) & set(new[size])):
+            for metric in ("seconds", "attempts", "nodes"):
+                if metric not in old[size][benchmark] or metric not in new[size][benchmark]:
+                    continue
+
+                before = old[size][benchmark][metric][statistic]
+                after = new[size][benchmark][metric][statistic]
+                ratio = after/before if before else float("inf") if after else 1.0
+                print(f"{size:>4} {benchmark:>30} {metric:>8} {before:>12.6g} {after:>12.6g} {ratio:>6.2f}x")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "compare":
+        compare_results(*sys.argv[2:4])
+    else:
+        run_suite(path=sys.argv[1] if len(sys.argv) > 1 else "benchmark-results.json")
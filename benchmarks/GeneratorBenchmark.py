@@ -0,0 +1,30 @@
+import sys
+import time
+import random
+
+import src.Board as Board
+
+
+def compare_generators(sizes: range = range(8, 16), boards_per_size: int = 5, seed: int = 0) -> None:
+    """ Print the average solver calls and seconds each generator needs per unique board
+    for each board size in 'sizes', creating 'boards_per_size' boards with each one.
+    """
+    
+    print(f"{'size':>4} {'reject calls':>13} {'reject time':>12} {'repair calls':>13} {'repair time':>12}")
+    for size in sizes:
+        row = [f"{size:>4}"]
+        for repair in (False, True):
+            random.seed(seed)
+            calls = [0]
+            initial_time = time.perf_counter()
+            for _ in range(boards_per_size):
+                Board.create_single_solution_board(size, repair=repair, calls=calls)
+            elapsed = time.perf_counter() - initial_time
+            
+            row.append(f"{calls[0]/boards_per_size:>13.1f} {elapsed/boards_per_size:>11.2f}s")
+        print(" ".join(row))
+        sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    compare_generators(boards_per_size=int(sys.argv[1]) if len(sys.argv) > 1 else 5)
@@ -0,0 +1,223 @@
+import os
+import sys
+import json
+import time
+import random
+import tempfile
+
+# Draw into memory so this runs without a screen
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+import src.Board as Board
+import src.Constants as constants
+from src.Store import BoardStore
+from Capital import Capital
+from benchmarks.BenchmarkSuite import summarize
+
+
+PHASES = ("events", "update", "draw", "flip")
+
+
+def create_random_board(size: int) -> Board.Board:
+    """ Returns a filled board with 'size' rows and columns, which only has to look like a puzzle.
+    """
+
+    board = Board.create_board(size)
+    Board.create_capitals(board)
+    return board
+
+
+def get_mouse_pos(frame: int, frames: int, area: tuple[int, int, int, int]) -> tuple[int, int]:
+    """ Returns where the mouse is on 'frame' out of 'frames' while sweeping back and forth
+    across the rows of 'area', which is ('x', 'y', 'width', 'height').
+    """
+
+    x, y, width, height = area
+    rows = 8
+    progress = frame * rows / max(1, frames)
+    row = min(int(progress), rows - 1)
+    across = progress - int(progress)
+    if row % 2:
+        across = 1 - across
+
+    return int(x + across*(width - 1)), int(y + (row + 0.5)*height/rows)
+
+
+def run_frames(capital: Capital, frames: int, area: tuple[int, int, int, int],
+               get_events=None) -> dict[str, list[float]]:
+    """ Run 'frames' frames of 'capital' with the mouse sweeping over 'area', returning the seconds
+    every frame spent in each phase. 'get_events' can add events for a frame given its number.
+    """
+
+    times = {phase: [] for phase in PHASES + ("total",)}
+    previous_pos = get_mouse_pos(0, frames, area)
+    for frame in range(frames):
+        pos = get_mouse_pos(frame, frames, area)
+        events = [pygame.event.Event(pygame.MOUSEMOTION, pos=pos, rel=(pos[0] - previous_pos[0], pos[1] - previous_pos[1]),
+                                     buttons=(0, 0, 0))]
+        if get_events:
+            events += get_events(frame)
+        previous_pos = pos
+
+        initial_time = time.perf_counter()
+        capital.handle_events(events)
+        capital.mouse_pos = pos  # The dummy driver has no real mouse to read
+        event_time = time.perf_counter()
+        capital.update_screen()
+        update_time = time.perf_counter()
+        capital.draw_screen()
+        draw_time = time.perf_counter()
+        capital.refresh_display()
+        flip_time = time.perf_counter()
+
+        times["events"].append(event_time - initial_time)
+        times["update"].append(update_time - event_time)
+        times["draw"].append(draw_time - update_time)
+        times["flip"].append(flip_time - draw_time)
+        times["total"].append(flip_time - initial_time)
+
+    return times
+
+
+def benchmark_home(capital: Capital, frames: int) -> dict[str, list[float]]:
+    """ Time the menu with the mouse sweeping over its buttons.
+    """
+
+    capital.screen = constants.HOME
+    capital.drawn_screen = None
+    return run_frames(capital, frames, (250, 300, 500, 200))
+
+
+def benchmark_game(capital: Capital, frames: int, board: Board.Board) -> dict[str, list[float]]:
+    """ Time a game on 'board', hovering over every row and placing or removing a capital every few frames.
+    """
+
+    capital.start_game(None, board)
+    x, y = int(capital.get_board_x()), int(capital.get_board_y())
+
+    def toggle_capital(frame: int) -> list[pygame.event.Event]:
+        if frame % 5 == 0:
+            square = capital.geometry.get_square(*get_mouse_pos(frame, frames, (x, y, Capital.BOARD_SIZE, Capital.BOARD_SIZE)))
+            if square:
+                column, row = square
+                capital.set_mark(column, row, 2 - capital.marked_board[row][column])
+        return []
+
+    times = run_frames(capital, frames, (x, y, Capital.BOARD_SIZE, Capital.BOARD_SIZE), toggle_capital)
+
+    # A finished board would move on to the end screen
+    capital.success = False
+    return times
+
+
+def benchmark_workshop(capital: Capital, frames: int, board: Board.Board) -> dict[str, list[float]]:
+    """ Time the workshop editing 'board', with the mouse sweeping over the board.
+    """
+
+    capital.start_game(None, board)
+    capital.screen = constants.WORKSHOP
+    capital.analysis_worker.submit(capital.board)
+    capital.create_workshop()
+    capital.drawn_screen = None
+
+    # Count the solutions first so every frame draws the same heatmap
+    while capital.analysis_worker.is_stale():
+        time.sleep(0.01)
+
+    area = (capital.workshop_geometry.x_pos, capital.workshop_geometry.y_pos, Capital.BOARD_SIZE/2, Capital.BOARD_SIZE/2)
+    return run_frames(capital, frames, area)
+
+
+def benchmark_custom(capital: Capital, frames: int, boards: list[Board.Board]) -> dict[str, list[float]]:
+    """ Time the saved boards screen holding 'boards', scrolling to the next page every few frames.
+    The boards are saved to a store of their own, which is reopened so they are read from disk like after a restart.
+    """
+
+    path = f"data/custom-{len(boards)}.log"
+    store = BoardStore(path)
+    for board in boards:
+        store.append(board)
+    store.close()
+
+    capital.custom_boards.close()
+    capital.custom_boards = BoardStore(path)
+    capital.custom_previews.clear()
+    capital.custom_page = 0
+    capital.create_custom_screen()
+    capital.screen = constants.CUSTOM
+    capital.drawn_screen = None
+
+    def scroll(frame: int) -> list[pygame.event.Event]:
+        if frame % 10 == 9:
+            return [pygame.event.Event(pygame.MOUSEWHEEL, x=0, y=-1, flipped=False)]
+        return []
+
+    return run_frames(capital, frames, (Capital.WIDTH/10, Capital.HEIGHT/10, Capital.WIDTH*4/5, Capital.HEIGHT*4/5), scroll)
+
+
+def run_benchmark(frames: int = 200, sizes: range = range(4, 16), custom_counts: tuple[int, ...] = (10, 100, 1000),
+                  seed: int = 0, path: str = None) -> dict[str, dict]:
+    """ Run 'frames' frames of every screen: the menu, a game at every size in 'sizes', the workshop
+    and the saved boards screen holding each of 'custom_counts' boards; and print how long each phase took.
+    The results are returned and written as JSON to 'path' if it is set.
+    """
+
+    random.seed(seed)
+    game_boards = {size: create_random_board(size) for size in sizes}
+    workshop_boards = {size: create_random_board(size) for size in (5, 10, 15)}
+    custom_boards = [create_random_board(random.randint(5, 15)) for _ in range(max(custom_counts))]
+
+    results = {}
+    working_directory = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        # Keep the saved boards, cache and pool of the real game out of the benchmark
+        os.chdir(directory)
+        os.mkdir("data")
+
+        capital = Capital()
+        # Workers creating boards in the background would take the processor from the frames being timed
+        capital.puzzle_pool.close()
+        try:
+            scenarios = [("home", lambda: benchmark_home(capital, frames))]
+            scenarios += [(f"game-{size}", lambda size=size: benchmark_game(capital, frames, game_boards[size].copy()))
+                          for size in sizes]
+            scenarios += [(f"workshop-{size}", lambda size=size: benchmark_workshop(capital, frames, workshop_boards[size].copy()))
+                          for size in workshop_boards]
+            scenarios += [(f"custom-{count}", lambda count=count: benchmark_custom(capital, frames, custom_boards[:count]))
+                          for count in custom_counts]
+
+            print(f"{'screen':>12} " + " ".join(f"{phase + ' p50':>11} {phase + ' p95':>11}" for phase in PHASES + ("total",)))
+            for name, benchmark in scenarios:
+                times = benchmark()
+                results[name] = {phase: summarize(samples) for phase, samples in times.items()}
+
+                print(f"{name:>12} " + " ".join(f"{results[name][phase]['median']*1000:>9.3f}ms {results[name][phase]['p95']*1000:>9.3f}ms"
+                                                for phase in PHASES + ("total",)))
+                sys.stdout.flush()
+        finally:
+            capital.analysis_worker.close()
+            capital.custom_boards.close()
+            pygame.quit()
+            os.chdir(working_directory)
+
+    if path:
+        with open(path, "w") as file:
+            json.dump({"meta": {"frames": frames, "seed": seed, "driver": os.environ["SDL_VIDEODRIVER"]},
+                       "screens": results}, file, indent=2)
+
+    return results
+
+
+if __name__ == "__main__":
+    # Usage: python -m benchmarks.RenderBenchmark [results path] [p95 budget in ms]
+    # Exits with 1 if any screen's 95th percentile frame takes longer than the budget
+    results = run_benchmark(path=sys.argv[1] if len(sys.argv) > 1 else None)
+
+    if len(sys.argv) > 2:
+        budget = float(sys.argv[2]) / 1000
+        over = [name for name, phases in results.items() if phases["total"]["p95"] > budget]
+        if over:
+            print("Over budget:", ", ".join(over))
+            sys.exit(1)
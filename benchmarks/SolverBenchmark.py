@@ -0,0 +1,84 @@
+import sys
+import time
+import random
+
+import src.Board as Board
+import src.Solver as Solver
+
+
+def time_solver(solver: str, boards: list[list[list[int]]], cap: int) -> tuple[float, list[int]]:
+    """ Returns the seconds 'solver' takes to count the solutions to every board
+    in 'boards' stopping at 'cap', along with the counts it found.
+    """
+    
+    counts = []
+    initial_time = time.perf_counter()
+    for board in boards:
+        counts.append(Board.SOLVERS[solver](board, cap))
+        
+    return time.perf_counter() - initial_time, counts
+
+
+def compare_solvers(solver: str = "bitboard", baseline: str = "recursive", sizes: range = range(4, 16),
+                    boards_per_size: int = 20, seed: int = 0) -> None:
+    """ Print how much faster 'solver' is than 'baseline' for each board size in 'sizes'
+    on 'boards_per_size' random boards, both for full counts and for uniqueness checks.
+    """
+    
+    random.seed(seed)
+    
+    print(f"{'size':>4} {'count ' + baseline:>18} {'count ' + solver:>18} {'speedup':>8}"
+          f" {'unique ' + baseline:>18} {'unique ' + solver:>18} {'speedup':>8}")
+    for size in sizes:
+        boards = []
+        for _ in range(boards_per_size):
+            board = Board.create_board(size)
+            Board.create_capitals(board)
+            boards.append(board)
+        
+        row = [f"{size:>4}"]
+        for cap in (0, 2):
+            baseline_time, baseline_counts = time_solver(baseline, boards, cap)
+            solver_time, solver_counts = time_solver(solver, boards, cap)
+            
+            # Both engines must agree on every board
+            if baseline_counts != solver_counts:
+                raise AssertionError(f"{solver} disagrees with {baseline} on a {size}x{size} board")
+            
+            row.append(f"{baseline_time*1000:>16.1f}ms {solver_time*1000:>16.1f}ms"
+                       f" {baseline_time/max(solver_time, 1e-9):>7.1f}x")
+        print(" ".join(row))
+        sys.stdout.flush()
+
+
+def compare_nodes(sizes: range = range(4, 16), boards_per_size: int = 20, seed: int = 0) -> None:
+    """ Print the search nodes the bitboard and propagation engines need for each board size
+    in 'sizes' on 'boards_per_size' random boards, both for full counts and for uniqueness checks.
+    """
+    
+    random.seed(seed)
+    
+    print(f"{'size':>4} {'count bitboard':>16} {'count propagation':>18} {'unique bitboard':>16} {'unique propagation':>19}")
+    for size in sizes:
+        boards = []
+        for _ in range(boards_per_size):
+            board = Board.create_board(size)
+            Board.create_capitals(board)
+            boards.append(board)
+        
+        row = [f"{size:>4}"]
+        for cap in (0, 2):
+            bitboard_nodes, propagation_nodes = [0], [0]
+            for board in boards:
+                Solver.bitboard_solutions(board, cap, bitboard_nodes)
+                Solver.propagation_solutions(board, cap, propagation_nodes)
+            row.append(f"{bitboard_nodes[0]:>16} {propagation_nodes[0]:>18}")
+        print(" ".join(row))
+        sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "nodes":
+        compare_nodes()
+    else:
+        compare_solvers(*sys.argv[1:3])
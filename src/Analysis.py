@@ -0,0 +1,186 @@
+import time
+import threading
+from typing import Callable
+
+import src.Board as Board
+import src.Solver as Solver
+
+
+class WorkshopAnalysis:
+    
+    board: list[list[int]]
+    solutions: int
+    
+    def __init__(self, board: list[list[int]]) -> None:
+        """ Keep track of the amount of solutions to 'board' as it is edited. 'board' is edited
+        in place by 'set_cell', while 'grow' and 'shrink' replace it with a new board.
+        Counts are not timed for 'Board.solver_timer' on their own, 'AnalysisWorker' times each analysis as a whole.
+        """
+        
+        self.board = board
+        self.solutions = Board.count_solutions(board, caller=None)
+        
+    def count_with_capital_at(self, column: int, row: int) -> int:
+        """ Returns the amount of solutions to 'board' with a capital at 'column' and 'row'.
+        """
+        
+        if not 0 < self.board[row][column] <= len(self.board):
+            return 0
+        return Solver.dp_solutions(self.board, fixed=(column, row))
+        
+    def set_cell(self, column: int, row: int, city: int) -> int:
+        """ Change the square at 'column' and 'row' into 'city' and return the new amount of solutions.
+        Only solutions with a capital on that square can change: the ones using it for its old city are lost
+        and the ones using it for 'city' are gained, so only those two pinned counts are needed.
+        """
+        
+        if self.board[row][column] == city:
+            return self.solutions
+        
+        lost = self.count_with_capital_at(column, row)
+        self.board[row][column] = city
+        gained = self.count_with_capital_at(column, row)
+        
+        self.solutions += gained - lost
+        return self.solutions
+        
+    def grow(self) -> None:
+        """ Add an empty row and column to 'board'.
+        """
+        
+        self.board = Board.grow_board(self.board)
+        self.solutions = Board.count_solutions(self.board, caller=None)
+        
+    def shrink(self) -> None:
+        """ Remove the last row and column from 'board', emptying the squares of the city that no longer exists.
+        """
+        
+        self.board = Board.shrink_board(self.board)
+        self.solutions = Board.count_solutions(self.board, caller=None)
+
+
+class AnalysisResult:
+    
+    job: int
+    board: list[list[int]]
+    solutions: int
+    heatmap: list[list[int]]
+    
+    def __init__(self, job: int, board: list[list[int]], solutions: int, heatmap: list[list[int]]) -> None:
+        """ The outcome of analysing the snapshot 'board' submitted as 'job': its amount of 'solutions' and,
+        for every square, the amount of those solutions with a capital there in 'heatmap'.
+        """
+        
+        self.job = job
+        self.board = board
+        self.solutions = solutions
+        self.heatmap = heatmap
+
+
+class AnalysisWorker:
+    
+    # Each changed square takes two pinned counts, so recount from scratch past this many
+    MAX_CHANGES = 3
+    
+    job: int
+    result: AnalysisResult | None
+    
+    def __init__(self, on_result: Callable[[], None] = None) -> None:
+        """ Analyse workshop boards on a background thread. Submit snapshots with 'submit'
+        and read the latest finished analysis from 'result' without ever waiting.
+        A newer snapshot cancels the analysis of an older one.
+        'on_result' is called from the background thread whenever 'result' changes.
+        """
+        
+        self.job = 0
+        self.result = None
+        self.on_result = on_result
+        
+        self.pending = None
+        self.condition = threading.Condition()
+        self.running = True
+        
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+        
+    def submit(self, board: list[list[int]]) -> None:
+        """ Queue a snapshot of 'board' for analysis, replacing any snapshot not started yet.
+        """
+        
+        snapshot = [row[:] for row in board]
+        with self.condition:
+            self.job += 1
+            self.pending = (self.job, snapshot)
+            self.condition.notify()
+            
+    def is_stale(self) -> bool:
+        """ Returns True iff 'result' is missing or older than the last submitted snapshot.
+        """
+        
+        return self.result is None or self.result.job != self.job
+            
+    def close(self) -> None:
+        """ Stop the background thread once it finishes its current step.
+        """
+        
+        with self.condition:
+            self.running = False
+            self.condition.notify()
+            
+    def run(self) -> None:
+        """ Background thread loop: analyse the newest snapshot whenever there is one.
+        """
+        
+        analysis = None
+        while True:
+            with self.condition:
+                while self.running and self.pending is None:
+                    self.condition.wait()
+                if not self.running:
+                    return
+                job, board = self.pending
+                self.pending = None
+                
+            initial_time = time.perf_counter()
+            
+            # Reuse the last analysis for a few square edits, otherwise start over
+            changes = None
+            if analysis is not None and len(analysis.board) == len(board):
+                changes = [(column, row) for row in range(len(board)) for column in range(len(board))
+                           if analysis.board[row][column] != board[row][column]]
+                
+            if changes is None or len(changes) > AnalysisWorker.MAX_CHANGES:
+                analysis = WorkshopAnalysis([row[:] for row in board])
+            else:
+                for column, row in changes:
+                    # Every edit keeps the analysis whole, so a newer snapshot can pick up from here
+                    if self.is_cancelled(job):
+                        break
+                    analysis.set_cell(column, row, board[row][column])
+                    
+            heatmap = None if self.is_cancelled(job) else self.create_heatmap(analysis, job)
+            
+            # The heatmap goes straight to the engine, so time the whole analysis as one solver run
+            if Board.solver_timer is not None:
+                Board.solver_timer("analysis", "dp_heatmap", time.perf_counter() - initial_time)
+                
+            if heatmap is not None:
+                self.result = AnalysisResult(job, board, analysis.solutions, heatmap)
+                if self.on_result:
+                    self.on_result()
+                    
+    def is_cancelled(self, job: int) -> bool:
+        """ Returns True iff a newer snapshot than 'job' was submitted or the worker was closed.
+        """
+        
+        return self.job != job or not self.running
+                
+    def create_heatmap(self, analysis: WorkshopAnalysis, job: int) -> list[list[int]] | None:
+        """ Returns the amount of solutions with a capital on each square of the board held by 'analysis',
+        or None if a newer snapshot than 'job' arrives before it is finished.
+        """
+        
+        if not analysis.solutions:
+            return [[0 for column in range(len(analysis.board))] for row in range(len(analysis.board))]
+        
+        return Solver.dp_heatmap(analysis.board, lambda: self.is_cancelled(job))
@@ -0,0 +1,166 @@
+import numpy
+
+
+# Every function here takes a stack of K boards of the same size as an array of shape (K, size, size)
+# holding the city of each square, and looks at all K boards at once instead of one square at a time.
+
+
+def stack_boards(boards: list) -> numpy.ndarray:
+    """ Returns the boards in 'boards', which can be Boards or lists of rows, as one array of shape (K, size, size).
+    """
+
+    return numpy.stack([numpy.asarray(board, dtype=numpy.int16) for board in boards])
+
+
+def get_valid_squares(boards: numpy.ndarray) -> numpy.ndarray:
+    """ Returns which squares of 'boards' belong to a city, meaning they hold a city from 1 to size.
+    """
+
+    size = boards.shape[-1]
+    return (boards > 0) & (boards <= size)
+
+
+def count_per_city(boards: numpy.ndarray, squares: numpy.ndarray) -> numpy.ndarray:
+    """ Returns the amount of set 'squares' each city has on each board, as an array of shape (K, size).
+    'squares' is a boolean array shaped like 'boards'.
+    """
+
+    count, size = boards.shape[0], boards.shape[-1]
+
+    # Give every board its own range of bins so one bincount covers the whole stack
+    cities = numpy.where(get_valid_squares(boards) & squares, boards, 0).astype(numpy.int64)
+    bins = cities + (size + 1)*numpy.arange(count).reshape(-1, 1, 1)
+
+    return numpy.bincount(bins.ravel(), minlength=count*(size + 1)).reshape(count, size + 1)[:, 1:]
+
+
+def get_city_sizes(boards: numpy.ndarray) -> numpy.ndarray:
+    """ Returns the amount of squares in each city on each board, as an array of shape (K, size).
+    """
+
+    return count_per_city(boards, numpy.ones(boards.shape, dtype=bool))
+
+
+def get_city_squares(boards: numpy.ndarray) -> tuple[numpy.ndarray, numpy.ndarray]:
+    """ Returns the squares of every board ordered by city, as indexes (row * size + column) in an array of shape
+    (K, size * size), along with where each city starts in that order in an array of shape (K, size + 1).
+    City i + 1 of board k is 'squares[k, starts[k, i]:starts[k, i + 1]]'. Squares outside of every city come last.
+    """
+
+    size = boards.shape[-1]
+    cities = numpy.where(get_valid_squares(boards), boards, size + 1).reshape(boards.shape[0], -1)
+
+    # A stable sort keeps the squares of each city in reading order
+    squares = numpy.argsort(cities, axis=1, kind="stable")
+
+    starts = numpy.zeros((boards.shape[0], size + 1), dtype=numpy.int64)
+    starts[:, 1:] = numpy.cumsum(get_city_sizes(boards), axis=1)
+
+    return squares, starts
+
+
+def get_components(boards: numpy.ndarray) -> numpy.ndarray:
+    """ Returns a label for every square of every board, shaped like 'boards', that two squares share
+    iff they are in the same city and connected by moving up, down, left or right within it.
+    Each label is the index (row * size + column) of the first square of its part of the city.
+    """
+
+    count, size = boards.shape[0], boards.shape[-1]
+    valid = get_valid_squares(boards)
+
+    # Neighbouring squares in the same city
+    same_right = (boards[:, :, :-1] == boards[:, :, 1:]) & valid[:, :, :-1]
+    same_down = (boards[:, :-1, :] == boards[:, 1:, :]) & valid[:, :-1, :]
+
+    labels = numpy.broadcast_to(numpy.arange(size*size).reshape(size, size), boards.shape).copy()
+    while True:
+        previous = labels
+
+        # Hook every square onto the smallest label next to it in its city
+        labels = labels.copy()
+        right = numpy.minimum(labels[:, :, :-1], labels[:, :, 1:])
+        labels[:, :, :-1] = numpy.where(same_right, right, labels[:, :, :-1])
+        labels[:, :, 1:] = numpy.where(same_right, numpy.minimum(labels[:, :, 1:], right), labels[:, :, 1:])
+        down = numpy.minimum(labels[:, :-1, :], labels[:, 1:, :])
+        labels[:, :-1, :] = numpy.where(same_down, down, labels[:, :-1, :])
+        labels[:, 1:, :] = numpy.where(same_down, numpy.minimum(labels[:, 1:, :], down), labels[:, 1:, :])
+
+        # Then jump straight to the label of that label so long snakes take few passes
+        flat = labels.reshape(count, -1)
+        labels = numpy.take_along_axis(flat, flat, axis=1).reshape(boards.shape)
+
+        if numpy.array_equal(labels, previous):
+            return labels
+
+
+def get_connected_cities(boards: numpy.ndarray) -> numpy.ndarray:
+    """ Returns whether each city on each board is one connected, non empty region, as an array of shape (K, size).
+    """
+
+    size = boards.shape[-1]
+    roots = get_components(boards) == numpy.arange(size*size).reshape(size, size)
+
+    # A connected city has exactly one square that labels its whole region
+    return count_per_city(boards, roots) == 1
+
+
+def are_connected(boards: numpy.ndarray) -> numpy.ndarray:
+    """ Returns whether every city on each board is one connected, non empty region, as an array of shape (K,).
+    """
+
+    return get_connected_cities(boards).all(axis=1)
+
+
+def are_filled(boards: numpy.ndarray) -> numpy.ndarray:
+    """ Returns whether every square of each board belongs to a city, as an array of shape (K,).
+    """
+
+    return get_valid_squares(boards).all(axis=(1, 2))
+
+
+def get_band_excess(boards: numpy.ndarray) -> numpy.ndarray:
+    """ Returns, for each board, the most cities that fit inside any band of consecutive rows
+    minus the amount of rows in that band, as an array of shape (K,).
+    Every city needs its capital inside the rows it covers and every row holds one capital,
+    so a board where this is above 0 has no solutions.
+    """
+
+    count, size = boards.shape[0], boards.shape[-1]
+
+    # The first and last row each city covers, empty cities cover every row
+    cities = numpy.where(get_valid_squares(boards), boards, 0).astype(numpy.int64)
+    bins = (numpy.arange(count).reshape(-1, 1, 1)*size + numpy.arange(size).reshape(1, -1, 1))*(size + 1) + cities
+    present = numpy.bincount(bins.ravel(), minlength=count*size*(size + 1)).reshape(count, size, size + 1)[:, :, 1:] > 0
+    covered = present.any(axis=1)
+    first = numpy.where(covered, present.argmax(axis=1), 0)
+    last = numpy.where(covered, size - 1 - present[:, ::-1].argmax(axis=1), size - 1)
+
+    # Count cities by their first and last row, then add up every city inside each band [top, bottom]
+    bins = (numpy.arange(count).reshape(-1, 1)*size + first)*size + last
+    spans = numpy.bincount(bins.ravel(), minlength=count*size*size).reshape(count, size, size)
+    inside = spans[:, ::-1].cumsum(axis=1)[:, ::-1].cumsum(axis=2)
+
+    top = numpy.arange(size).reshape(-1, 1)
+    bottom = numpy.arange(size).reshape(1, -1)
+    excess = numpy.where(top <= bottom, inside - (bottom - top + 1), -size)
+
+    return excess.reshape(count, -1).max(axis=1)
+
+
+def pass_band_filters(boards: numpy.ndarray) -> numpy.ndarray:
+    """ Returns whether each board can have a solution as far as bands of rows and bands of columns can tell,
+    as an array of shape (K,). Boards that fail have no solutions, boards that pass still need a solver.
+    """
+
+    return (get_band_excess(boards) <= 0) & (get_band_excess(boards.transpose(0, 2, 1)) <= 0)
+
+
+def screen_boards(boards: numpy.ndarray) -> numpy.ndarray:
+    """ Returns whether each board is worth handing to a solver to check for a unique solution,
+    as an array of shape (K,): it has to be filled, have every city connected and pass the band filters.
+    """
+
+    keep = are_filled(boards) & are_connected(boards)
+    keep[keep] = pass_band_filters(boards[keep])
+
+    return keep
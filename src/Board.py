@@ -1,9 +1,175 @@
 
 import time
+import atexit
+import heapq
+import queue
 import random
+import multiprocessing
+from typing import Iterator
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
-def create_board(board_size: int) -> list[list[int]]:
+import src.Solver as Solver
+import src.Placement as Placement
+from src.Cache import SolutionCache, get_canonical_form
+from src.Stats import SolverStats
+
+
+def get_zobrist_key(square: int, city: int) -> int:
+    """ Returns a random looking 64 bit key for 'city' being on 'square', always the same one.
+    Empty squares have a key of 0 so they never change the hash.
+    """
+    
+    if not city:
+        return 0
+    
+    # Mix the pair the same way splitmix64 does
+    key = (square*256 + city)*0x9E3779B97F4A7C15 & 0xFFFFFFFFFFFFFFFF
+    key = (key ^ (key >> 30))*0xBF58476D1CE4E5B9 & 0xFFFFFFFFFFFFFFFF
+    key = (key ^ (key >> 27))*0x94D049BB133111EB & 0xFFFFFFFFFFFFFFFF
+    return key ^ (key >> 31)
+
+
+class BoardRow:
+    
+    __slots__ = ("board", "start", "view")
+    
+    def __init__(self, board: "Board", row: int) -> None:
+        """ Create a view of the squares of 'row' on 'board' that reads and writes
+        like a list of cities, keeping the board's hash up to date.
+        """
+        
+        self.board = board
+        self.start = row*board.size
+        self.view = memoryview(board.cells)[self.start:self.start + board.size]
+        
+    def __getitem__(self, column: int | slice) -> int | list[int]:
+        if isinstance(column, slice):
+            return self.view[column].tolist()
+        return self.view[column]
+    
+    def __setitem__(self, column: int, city: int) -> None:
+        previous = self.view[column]
+        self.view[column] = city
+        
+        if self.board.zobrist is not None:
+            square = self.start + column % self.board.size
+            self.board.zobrist ^= get_zobrist_key(square, previous) ^ get_zobrist_key(square, city)
+        
+    def __len__(self) -> int:
+        return self.board.size
+    
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.view)
+    
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, (BoardRow, list, tuple)):
+            return NotImplemented
+        return self.view.tolist() == list(other)
+    
+    def __repr__(self) -> str:
+        return str(self.view.tolist())
+    
+    
+class Board:
+    
+    __slots__ = ("size", "cells", "rows", "zobrist")
+    
+    size: int
+    cells: bytearray
+    rows: list[BoardRow]
+    zobrist: int | None
+    
+    def __init__(self, size: int, cells: bytes = None) -> None:
+        """ Create a board with 'size' rows and columns, empty unless the row by row 'cells' are given.
+        Squares are stored one byte each in 'cells', which numpy and pygame can read without copying,
+        while 'board[row][column]' still works like it does for a list of lists.
+        """
+        
+        self.size = size
+        self.cells = bytearray(cells) if cells is not None else bytearray(size*size)
+        if len(self.cells) != size*size:
+            raise ValueError(f"A board of size {size} needs {size*size} squares, not {len(self.cells)}")
+        
+        self.rows = [BoardRow(self, row) for row in range(size)]
+        # Left unknown until the first hash so writes to boards nobody hashes cost nothing
+        self.zobrist = None
+        
+    @classmethod
+    def from_list(cls, rows: list[list[int]]) -> "Board":
+        """ Returns a board with the cities in 'rows', such as a board loaded from JSON.
+        """
+        
+        return cls(len(rows), bytes(city for row in rows for city in row))
+    
+    def to_list(self) -> list[list[int]]:
+        """ Returns the cities on this board as a list of rows, such as for saving it as JSON.
+        """
+        
+        return [row.view.tolist() for row in self.rows]
+    
+    def copy(self) -> "Board":
+        """ Returns a new board with the same cities.
+        """
+        
+        return Board(self.size, self.cells)
+    
+    def rehash(self) -> None:
+        """ Forget 'zobrist', needed after writing to 'cells' directly. The next hash works it out again.
+        """
+        
+        self.zobrist = None
+            
+    def as_array(self):
+        """ Returns a 'size' by 'size' numpy array sharing memory with 'cells'.
+        Writing to it does not update 'zobrist', call 'rehash' afterwards.
+        """
+        
+        if numpy is None:
+            raise ImportError("numpy is needed to view a board as an array")
+        return numpy.frombuffer(self.cells, dtype=numpy.uint8).reshape(self.size, self.size)
+    
+    def __array__(self, dtype=None, copy=None):
+        array = self.as_array()
+        return array.astype(dtype) if dtype is not None else array.copy()
+    
+    def __getitem__(self, row: int | slice) -> BoardRow | list[BoardRow]:
+        return self.rows[row]
+    
+    def __len__(self) -> int:
+        return self.size
+    
+    def __iter__(self) -> Iterator[BoardRow]:
+        return iter(self.rows)
+    
+    def __eq__(self, other) -> bool:
+        if isinstance(other, Board):
+            return self.cells == other.cells
+        # Anything else has to be rows like the ones 'to_list' returns
+        if not isinstance(other, (list, tuple)) or not all(isinstance(row, (BoardRow, list, tuple)) for row in other):
+            return NotImplemented
+        return self.to_list() == [list(row) for row in other]
+    
+    def __hash__(self) -> int:
+        # Worked out once, then kept up to date by every write so hashing never looks at the squares again
+        if self.zobrist is None:
+            self.zobrist = 0
+            for square, city in enumerate(self.cells):
+                if city:
+                    self.zobrist ^= get_zobrist_key(square, city)
+        return hash((self.size, self.zobrist))
+    
+    def __reduce__(self):
+        return (Board, (self.size, bytes(self.cells)))
+    
+    def __repr__(self) -> str:
+        return str(self.to_list())
+
+
+def create_board(board_size: int) -> Board:
     """ Return an empty board with 'board_size' rows and columns.
     
     Prerequisites:
@@ -12,7 +178,32 @@ def create_board(board_size: int) -> list[list[int]]:
     
     if board_size < 4:
         raise ValueError
-    return [[0 for column in range(board_size)] for row in range(board_size)]
+    return Board(board_size)
+    
+
+def grow_board(board: Board) -> Board:
+    """ Return a copy of 'board' with an empty row and column added.
+    """
+    
+    size = len(board)
+    grown = Board(size + 1)
+    for row in range(size):
+        grown.cells[row*(size + 1):row*(size + 1) + size] = board.cells[row*size:(row + 1)*size]
+    
+    # Squares moved, so their keys changed too
+    grown.rehash()
+    return grown
+
+
+def shrink_board(board: Board) -> Board:
+    """ Return a copy of 'board' without its last row and column, emptying the squares of the city that no longer exists.
+    """
+    
+    size = len(board)
+    emptied = bytearray(range(256))
+    emptied[size] = 0
+    
+    return Board(size - 1, b"".join(board.cells[row*size:(row + 1)*size - 1] for row in range(size - 1)).translate(emptied))
     
 
 def print_board(board: list[list[int]]) -> None:
@@ -59,26 +250,197 @@ def spread_cities(board: list[list[int]]) -> None:
             spread_city_to(board, column, row - dir, board[row][column])
 
 
-def create_capitals(board: list[list[int]]) -> list[tuple[int, int]]:
-    """ Creates positions for capitals until a valid orientation is created using recursion.
+def get_neighbours(board: list[list[int]], column: int, row: int) -> list[tuple[int, int]]:
+    """ Returns the column and row of every square on 'board' directly above, below, left or right of 'column' and 'row'.
     """
     
-    # Create a valid combination of capitals that wont interfere one another
-    capitals = []
-    invalid_locations = [[] for _ in range(len(board))]
-    while len(capitals) < len(board):
-        last_column = -2 if not len(capitals) else capitals[-1][0]
-        open_columns = [col for col in range(len(board))
-                        if col not in [i[0] for i in capitals]
-                        and (abs(last_column - col) > 1)
-                        and col not in invalid_locations[len(capitals)]]
-        if len(open_columns) == 0:
-            # Not a valid combination of crowns so go back
-            invalid_locations[len(capitals) - 1].append(last_column)
-            invalid_locations[len(capitals)].clear()
-            capitals.pop()
+    return [(c, r) for c, r in ((column - 1, row), (column + 1, row), (column, row - 1), (column, row + 1))
+            if 0 <= c < len(board) and 0 <= r < len(board)]
+
+
+def get_squares(board: list[list[int]]) -> list[int]:
+    """ Returns the city on every square of 'board', row by row in one flat list.
+    """
+    
+    if isinstance(board, Board):
+        return list(board.cells)
+    return [city for row in board for city in row]
+
+
+def set_squares(board: list[list[int]], squares: list[int]) -> None:
+    """ Change the city on every square of 'board' to the ones in the flat list 'squares' from 'get_squares'.
+    """
+    
+    if isinstance(board, Board):
+        board.cells[:] = bytes(squares)
+        board.rehash()
+        return
+    
+    size = len(board)
+    for row in range(size):
+        board[row][:] = squares[row*size:(row + 1)*size]
+
+
+def grow_sweep(board: list[list[int]]) -> None:
+    """ Growth policy: grow cities the same way repeated 'spread_cities' calls do,
+    but only visit city squares that still have an empty neighbour, taking them from a heap one sweep at a time.
+    This still takes several sweeps, but none of them rescans the filled squares.
+    Like 'spread_cities' this favours higher up cities, which makes unique boards more likely.
+    """
+    
+    size = len(board)
+    squares = get_squares(board)
+    
+    # Squares are numbered in the order 'spread_cities' visits them
+    next_sweep = [square for square, city in enumerate(squares) if city]
+    while next_sweep:
+        sweep = next_sweep
+        heapq.heapify(sweep)
+        next_sweep = []
+        
+        while sweep:
+            square = heapq.heappop(sweep)
+            row, column = divmod(square, size)
+            
+            # One random draw picks both the direction and whether to try sideways first
+            choice = random.getrandbits(2)
+            dir = 1 if choice & 1 else -1
+            targets = ((column + dir, row), (column - dir, row), (column, row + dir), (column, row - dir))
+            for c, r in targets if choice & 2 else targets[2:]:
+                # Same as 'spread_city_to'
+                if 0 <= c < size and 0 <= r < size and not squares[r*size + c]:
+                    squares[r*size + c] = squares[square]
+                    # Squares later in this sweep spread during it, just like in 'spread_cities'
+                    if r*size + c > square:
+                        heapq.heappush(sweep, r*size + c)
+                    else:
+                        next_sweep.append(r*size + c)
+                    break
+            
+            # Keep visiting this square until it has no empty neighbours left
+            for c, r in targets:
+                if 0 <= c < size and 0 <= r < size and not squares[r*size + c]:
+                    next_sweep.append(square)
+                    break
+                
+    set_squares(board, squares)
+
+
+def choose_uniform(frontier: list[tuple[int, int]], squares: list[int], size: int, sizes: list[int]) -> int:
+    """ Every city border is equally likely to grow next.
+    """
+    
+    return random.randrange(len(frontier))
+
+
+def choose_balanced(frontier: list[tuple[int, int]], squares: list[int], size: int, sizes: list[int]) -> int:
+    """ Out of a few random city borders, grow the one belonging to the smallest city.
+    """
+    
+    best = random.randrange(len(frontier))
+    for _ in range(2):
+        i = random.randrange(len(frontier))
+        if sizes[frontier[i][1] - 1] < sizes[frontier[best][1] - 1]:
+            best = i
+            
+    return best
+
+
+def choose_compact(frontier: list[tuple[int, int]], squares: list[int], size: int, sizes: list[int]) -> int:
+    """ Out of a few random city borders, grow into the square that touches that city the most.
+    """
+    
+    best = -1
+    best_touching = -1
+    for _ in range(3):
+        i = random.randrange(len(frontier))
+        square, city = frontier[i]
+        column = square % size
+        touching = ((column > 0 and squares[square - 1] == city) + (column < size - 1 and squares[square + 1] == city) +
+                    (square >= size and squares[square - size] == city) +
+                    (square + size < len(squares) and squares[square + size] == city))
+        if touching > best_touching:
+            best, best_touching = i, touching
+            
+    return best
+
+
+def grow_frontier(board: list[list[int]], choose) -> None:
+    """ Fill every empty space on 'board' by growing the cities already on it one square at a time.
+    Only empty squares next to a city are ever considered, and 'choose' picks the index of the one that grows next
+    given that list of (square, city), the flat squares from 'get_squares', the board size and the size of every city.
+    """
+    
+    size = len(board)
+    squares = get_squares(board)
+    
+    # Every empty square next to a city, along with that city, and a bit for every city each square is listed with
+    frontier = []
+    listed = [0 for square in squares]
+    sizes = [0 for city in range(size)]
+    
+    def add_neighbours(square: int, city: int) -> None:
+        column = square % size
+        for neighbour in ((square - 1 if column > 0 else -1), (square + 1 if column < size - 1 else -1),
+                          square - size, (square + size if square + size < len(squares) else -1)):
+            if neighbour >= 0 and not squares[neighbour] and not listed[neighbour] >> city & 1:
+                listed[neighbour] |= 1 << city
+                frontier.append((neighbour, city))
+    
+    for square, city in enumerate(squares):
+        if city:
+            sizes[city - 1] += 1
+            add_neighbours(square, city)
+    
+    while frontier:
+        # Swap the chosen border to the end so it can be removed in constant time
+        i = choose(frontier, squares, size, sizes)
+        frontier[i], frontier[-1] = frontier[-1], frontier[i]
+        square, city = frontier.pop()
+        
+        # Another city already grew into this square
+        if squares[square]:
             continue
-        capitals.append((random.choice(open_columns), len(capitals)))
+        
+        squares[square] = city
+        sizes[city - 1] += 1
+        add_neighbours(square, city)
+        
+    set_squares(board, squares)
+
+
+# Policies that fill a board by growing the cities on it, see 'grow_cities'
+GROWTH_POLICIES = {
+    "sweep": grow_sweep,
+    "uniform": lambda board: grow_frontier(board, choose_uniform),
+    "balanced": lambda board: grow_frontier(board, choose_balanced),
+    "compact": lambda board: grow_frontier(board, choose_compact),
+}
+
+
+def grow_cities(board: list[list[int]], policy: str = "sweep") -> None:
+    """ Fill every empty space on 'board' by growing the cities already on it using the growth 'policy'.
+    Every policy only looks at city borders: 'sweep' repeats the sweeps of 'spread_cities' over those alone,
+    while the others grow one square at a time, filling the board in a single pass.
+    """
+    
+    GROWTH_POLICIES[policy](board)
+
+
+# Ways to place a capital in every row and column without any touching, see 'create_capitals'
+PLACEMENTS = {
+    "uniform": Placement.sample_placement,
+    "search": Placement.search_placement,
+}
+
+
+def create_capitals(board: list[list[int]], policy: str = "sweep", placement: str = "uniform") -> list[tuple[int, int]]:
+    """ Creates positions for capitals using 'placement', by default picking uniformly from every valid orientation,
+    then grows cities around them using the growth 'policy'.
+    """
+    
+    # Create a valid combination of capitals that wont interfere one another
+    capitals = PLACEMENTS[placement](len(board))
     
     # Optional to remove exploiting each color having a capital on a predefined row
     random.shuffle(capitals)
@@ -88,8 +450,7 @@ def create_capitals(board: list[list[int]]) -> list[tuple[int, int]]:
         board[row][column] = i + 1
     
     # Create cities around the capitals
-    while not all(square for row in board for square in row):
-        spread_cities(board)
+    grow_cities(board, policy)
                 
     return capitals
 
@@ -109,8 +470,9 @@ def get_cities(board: list[list[int]]) -> list[list[tuple[int, int]]]:
 
 
 def try_capital(solutions: list[int], board: list[list[int]], cities: list[list[tuple[int, int]]],
-                cap: int, capitals: list[tuple[int, int]], depth: int) -> None:
+                cap: int, capitals: list[tuple[int, int]], depth: int, stats: SolverStats = None) -> None:
     """ Increases the first element in 'solutions' by the amount of possible solutions to 'board'.
+    'stats' records every node, conflict and solution, if given.
     
     Prerequisites:
         captials = []
@@ -121,9 +483,14 @@ def try_capital(solutions: list[int], board: list[list[int]], cities: list[list[
     if cap and solutions[0] >= cap:
         return
     
+    if stats is not None:
+        stats.visit(depth)
+    
     # Found a possible solution! Try to find another
     if depth == len(board):
         solutions[0] += 1
+        if stats is not None:
+            stats.add_solution()
         return
     
     # Guess and check every valid position in this city
@@ -131,44 +498,343 @@ def try_capital(solutions: list[int], board: list[list[int]], cities: list[list[
         for cap_column, cap_row in capitals:
             # Check to see if this capital's position is interfering with another capital's positon
             if column == cap_column or row == cap_row or (-1 <= column - cap_column <= 1 and -1 <= row - cap_row <= 1):
+                if stats is not None:
+                    stats.add_conflict(column, row, cap_column, cap_row)
                 break
         else:
             # Case: This capital is in a valid position
-            try_capital(solutions, board, cities, cap, capitals + [(column, row)], depth + 1)
+            try_capital(solutions, board, cities, cap, capitals + [(column, row)], depth + 1, stats)
 
 
-def get_solutions(board: list[list[int]]) -> int:
-    """ Returns the amount of possible solutions to 'board'.
+def recursive_solutions(board: list[list[int]], cap: int = 0, stats: SolverStats = None) -> int:
+    """ Returns the amount of possible solutions to 'board' using 'try_capital', stopping at 'cap' if it is set.
+    'stats' records every node, conflict and solution, if given.
     """
     
+    if stats is not None:
+        stats.count_conflicts()
+    
     # Start recursion loop
     solutions = [0]
-    try_capital(solutions, board, sorted(get_cities(board), key=len), 0, [], 0)
+    try_capital(solutions, board, sorted(get_cities(board), key=len), cap, [], 0, stats)
     
     return solutions[0]
 
+
+# Engines that count the solutions to a board, see 'get_solutions'
+SOLVERS = {
+    "recursive": recursive_solutions,
+    "bitboard": Solver.bitboard_solutions,
+    "propagation": Solver.propagation_solutions,
+    "dp": Solver.dp_solutions,
+}
+DEFAULT_SOLVER = "bitboard"
+# Propagation needs far fewer nodes to find a second solution on large boards
+DEFAULT_UNIQUE_SOLVER = "propagation"
+# Engines that can fill in 'SolverStats', along with 'Solver.find_solutions' which lists the solutions for repairs.
+# Propagation rules squares out before trying them, so it is the only one that leaves conflicts unmeasured
+STATS_SOLVERS = {recursive_solutions, Solver.bitboard_solutions, Solver.propagation_solutions, Solver.find_solutions}
+
+
+# Shared by every function that counts solutions, set to None to turn caching off
+solution_cache = SolutionCache()
+
+# Called with who asked, the engine and the seconds taken after every solver run that names who asked, if set
+solver_timer = None
+
+# Called with the 'SolverStats' of every solver run in this process if set, for example 'SolverStats.merge'
+# to add up a whole generation run. Boards found in 'solution_cache' are never solved, so turn it off first
+stats_collector = None
+
+
+def run_solver(board: list[list[int]], cap: int, solver, caller: str = None) -> int | list[list[tuple[int, int]]]:
+    """ Returns the amount of possible solutions to 'board' stopping at 'cap' using the engine 'solver',
+    or the solutions themselves if 'solver' is 'Solver.find_solutions',
+    timing it for 'solver_timer' as asked for by 'caller' and collecting its stats for 'stats_collector' if they are set.
+    Runs without a 'caller' are not timed, for callers that time a larger piece of work themselves.
+    """
+    
+    if (solver_timer is None or caller is None) and stats_collector is None:
+        return solver(board, cap)
+    
+    initial_time = time.perf_counter()
+    if stats_collector is not None and solver in STATS_SOLVERS:
+        stats = SolverStats()
+        solutions = solver(board, cap, stats=stats)
+        stats_collector(stats)
+    else:
+        solutions = solver(board, cap)
+    
+    if solver_timer is not None and caller is not None:
+        solver_timer(caller, solver.__name__, time.perf_counter() - initial_time)
+    return solutions
+
+
+def solve(board: list[list[int]], cap: int, solver, caller: str = None) -> int:
+    """ Returns the amount of possible solutions to 'board' stopping at 'cap' from 'solution_cache',
+    only running the engine 'solver' for 'caller' if the cache has not seen this board or any of its rotations or recolourings.
+    """
+    
+    if solution_cache is None:
+        return run_solver(board, cap, solver, caller)
+    
+    key = get_canonical_form(board)
+    solutions = solution_cache.lookup(key, cap)
+    if solutions is None:
+        solutions = run_solver(board, cap, solver, caller)
+        solution_cache.store(key, cap, solutions)
+        
+    return solutions
+
+
+def get_solutions(board: list[list[int]], solver: str = None, caller: str | None = "get_solutions") -> int:
+    """ Returns the amount of possible solutions to 'board'. The run is timed as asked for by 'caller', see 'run_solver'.
+    """
+    
+    return solve(board, 0, SOLVERS[solver or DEFAULT_SOLVER], caller)
+
       
-def has_one_solutions(board: list[list[int]]) -> bool:
-    """ Returns True iff there is more than 1 solution.
+def has_one_solutions(board: list[list[int]], solver: str = None, caller: str | None = "has_one_solutions") -> bool:
+    """ Returns True iff there is exactly 1 solution. The run is timed as asked for by 'caller', see 'run_solver'.
     """
     
-    # Start recursion loop
-    solutions = [0]
-    try_capital(solutions, board, sorted(get_cities(board), key=len), 2, [], 0)
+    # Stop looking once a second solution is found
+    return solve(board, 2, SOLVERS[solver or DEFAULT_UNIQUE_SOLVER], caller) == 1
+
+
+def get_solver_stats(board: list[list[int]], cap: int = 0, solver: str = None) -> tuple[int, SolverStats]:
+    """ Returns the amount of possible solutions to 'board' stopping at 'cap', along with the stats of finding them.
+    Always runs the engine 'solver', which has to be in 'STATS_SOLVERS', even if 'solution_cache' knows the board.
+    """
+    
+    engine = SOLVERS[solver or DEFAULT_SOLVER]
+    if engine not in STATS_SOLVERS:
+        raise ValueError(f"solver {solver!r} does not collect stats")
+    
+    stats = SolverStats()
+    solutions = engine(board, cap, stats=stats)
+    
+    return solutions, stats
+
+
+def count_solutions(board: list[list[int]], cap: int = 0, caller: str | None = "count_solutions") -> int:
+    """ Returns the amount of possible solutions to 'board', or 'cap' if there are at least that many.
+    Unlike 'get_solutions' this never lists solutions, so boards with millions of them are still quick.
+    The run is timed as asked for by 'caller', see 'run_solver'.
+    """
+    
+    return solve(board, cap, Solver.dp_solutions, caller)
+
+
+def is_connected(squares: set[tuple[int, int]]) -> bool:
+    """ Returns True iff every square in 'squares' can reach every other one by moving
+    up, down, left or right without leaving 'squares'.
+    """
+    
+    if not squares:
+        return True
+    
+    start = next(iter(squares))
+    reached = {start}
+    unvisited = [start]
+    while unvisited:
+        column, row = unvisited.pop()
+        for neighbour in ((column - 1, row), (column + 1, row), (column, row - 1), (column, row + 1)):
+            if neighbour in squares and neighbour not in reached:
+                reached.add(neighbour)
+                unvisited.append(neighbour)
+                
+    return len(reached) == len(squares)
+
+
+def reassign_square(board: list[list[int]], column: int, row: int) -> bool:
+    """ Move the square at 'column' and 'row' into a random neighbouring city,
+    as long as its own city stays connected without it. Returns True iff the square was moved.
+    """
     
-    return solutions[0] == 1
+    city = board[row][column]
+    neighbours = [board[r][c] for c, r in get_neighbours(board, column, row) if board[r][c] != city]
+    if not neighbours:
+        return False
+    
+    remaining = {(c, r) for r in range(len(board)) for c in range(len(board))
+                 if board[r][c] == city and (c, r) != (column, row)}
+    if not remaining or not is_connected(remaining):
+        return False
+    
+    board[row][column] = random.choice(neighbours)
+    return True
 
 
-def create_single_solution_board(board_size: int) -> list[list[int]]:
-    """ Return a new board with only one solution
+def repair_board(board: list[list[int]], capitals: list[tuple[int, int]], calls: list[int] = None,
+                 caller: str | None = "repair_board") -> bool:
+    """ Edit the borders between cities on 'board' until 'capitals' is its only solution,
+    where the capital of city i + 1 is at index i of 'capitals'. Each edit moves a square
+    holding a capital of another solution into a neighbouring city, which rules that solution out.
+    Returns False if the board got stuck with more than one solution.
+    The first element in 'calls' is increased by the amount of solver calls, if given.
+    Every solver call is timed as asked for by 'caller', see 'run_solver'.
     """
     
+    intended = set(capitals)
+    for _ in range(len(board)**2):
+        if calls:
+            calls[0] += 1
+        solutions = run_solver(board, 2, Solver.find_solutions, caller)
+        if len(solutions) == 1:
+            return True
+        
+        other = solutions[0] if set(solutions[0]) != intended else solutions[1]
+        
+        # Capitals are never moved so the intended solution always stays valid
+        squares = [square for square in other if square not in intended]
+        random.shuffle(squares)
+        if not any(reassign_square(board, column, row) for column, row in squares):
+            return False
+        
+    return False
+
+
+def create_single_solution_board(board_size: int, workers: int = 0, repair: bool = False,
+                                 calls: list[int] = None, caller: str | None = "generation") -> Board:
+    """ Return a new board with only one solution.
+    If 'workers' is set, attempts run in that many processes and the first unique board wins.
+    If 'repair' is set, boards with several solutions are edited until they are unique instead of thrown away.
+    The first element in 'calls' is increased by the amount of solver calls, if given.
+    Solver calls in this process are timed as asked for by 'caller', see 'run_solver'.
+    """
+    
+    if workers:
+        # Closing the generator cancels the workers that lost the race
+        boards = create_single_solution_boards(board_size, 1, workers, repair)
+        board = next(boards)
+        boards.close()
+        return board
+    
     while True:
-        board = create_board(board_size)
-        create_capitals(board)
-        if has_one_solutions(board):
+        board = try_single_solution_board(board_size, repair, calls, caller)
+        if board is not None:
+            return board
+
+
+def try_single_solution_board(board_size: int, repair: bool = False, calls: list[int] = None,
+                              caller: str | None = "generation") -> Board | None:
+    """ Return a new board if it has only one solution, or None if this attempt failed.
+    See 'create_single_solution_board' for 'repair', 'calls' and 'caller'.
+    """
+    
+    board = create_board(board_size)
+    # Throwing boards away needs fewer attempts with the placements the search favours
+    capitals = create_capitals(board, placement="uniform" if repair else "search")
+    
+    if repair:
+        return board if repair_board(board, capitals, calls, caller) else None
+    
+    if calls:
+        calls[0] += 1
+    return board if has_one_solutions(board, caller=caller) else None
+
+
+# Processes shared by every parallel generation, started on first use, see 'get_generation_pool'
+generation_pool = None
+generation_workers = 0
+# The race the workers are running, workers give up on their board once it changes
+generation_run = None
+
+
+def start_generation_worker(run) -> None:
+    """ Pool initializer: share the current race with this worker.
+    """
+    
+    global generation_run
+    generation_run = run
+
+
+def get_generation_pool(workers: int):
+    """ Return the pool of 'workers' processes, only starting them the first time or when 'workers' changes,
+    since every new process has to import and load its tables again.
+    """
+    
+    global generation_pool, generation_workers, generation_run
+    
+    if generation_pool is None or generation_workers != workers:
+        close_generation_pool()
+        context = multiprocessing.get_context("spawn")
+        generation_run = context.Value("q", 0, lock=False)
+        generation_pool = context.Pool(workers, initializer=start_generation_worker, initargs=(generation_run,))
+        generation_workers = workers
+        
+    return generation_pool
+
+
+@atexit.register
+def close_generation_pool() -> None:
+    """ Stop the processes of the generation pool, if it was started.
+    """
+    
+    global generation_pool
+    
+    if generation_pool is not None:
+        generation_pool.terminate()
+        generation_pool = None
+
+
+def create_seeded_board(board_size: int, seed: int, repair: bool = False, run: int = None) -> Board | None:
+    """ Return a new board with only one solution using its own random stream seeded with 'seed',
+    or None if the race 'run' is over before it is found.
+    """
+    
+    random.seed(seed)
+    while run is None or generation_run.value == run:
+        board = try_single_solution_board(board_size, repair)
+        if board is not None:
             return board
+        
+    return None
+
 
+def create_single_solution_boards(board_size: int, count: int, workers: int = None,
+                                  repair: bool = False) -> Iterator[Board]:
+    """ Yield 'count' new boards with only one solution as soon as each one is finished.
+    Attempts run in 'workers' processes (the cpu count by default), each with its own random stream.
+    Workers still running are cancelled once enough boards are found or the iterator is closed.
+    The processes stay alive for the next call, so only the first call pays for starting them.
+    """
+    
+    workers = workers or multiprocessing.cpu_count()
+    pool = get_generation_pool(workers)
+    finished = queue.Queue()
+    
+    # Start a new race, boards from earlier ones go to their own queues
+    generation_run.value += 1
+    run = generation_run.value
+    
+    # Race every worker, then keep them busy until there are enough boards on the way
+    running = 0
+    def submit() -> None:
+        nonlocal running
+        running += 1
+        pool.apply_async(create_seeded_board, (board_size, random.getrandbits(64), repair, run),
+                         callback=finished.put, error_callback=finished.put)
+    
+    try:
+        for _ in range(workers):
+            submit()
+        
+        for found in range(count):
+            board = finished.get()
+            running -= 1
+            if isinstance(board, BaseException):
+                raise board
+            
+            yield board
+            
+            if running < count - found - 1:
+                submit()
+    finally:
+        # Make the workers that lost the race give up after their current attempt
+        generation_run.value += 1
+    
 
 if __name__ == "__main__":
     initial_time = time.time()
@@ -2,6 +2,34 @@
 import pygame
 
 import src.Palette as palette
+from src.Fonts import get_font
+
+# Surfaces of every button look created so far
+state_surfaces = {}
+
+
+def get_state_surfaces(text: str, width: int, height: int) -> dict[tuple[int, int, int], pygame.Surface]:
+    """ Returns a surface of a button with 'text' and size: 'width' and 'height'; for each of its background colours.
+    Buttons that look the same share their surfaces.
+    """
+    
+    key = (text, width, height)
+    if key in state_surfaces:
+        return state_surfaces[key]
+    
+    text_surf = get_font("monospaced", 30).render(text, True, palette.text)
+    
+    surfaces = {}
+    for color in (palette.button, palette.hovered_button, palette.pressed_button):
+        surf = pygame.Surface((width, height), pygame.SRCALPHA)
+        pygame.draw.rect(surf, color, (0, 0, surf.get_width(), surf.get_height()), 0, 25)
+        surf.blit(text_surf, ((surf.get_width() - text_surf.get_width()) / 2,
+                              (surf.get_height() - text_surf.get_height()) / 2))
+        surfaces[color] = surf
+        
+    state_surfaces[key] = surfaces
+    return surfaces
+
 
 class Button:
     
@@ -10,12 +38,13 @@ class Button:
     y_pos: int
     
     surf: pygame.Surface
+    surfaces: dict[tuple[int, int, int], pygame.Surface]
     
-    font: pygame.font.Font
     hovered: bool
+    pressed: bool
     
     def __init__(self, text: str, x_pos: int, y_pos: int, width: int, height: int) -> None:
-        """ Create a new button that draws on its own surface. Draw it on another surface using 'draw'.
+        """ Create a new button with a surface for each of its states. Draw it on another surface using 'draw'.
         Drawing will blit this button's surface at ('x_pos', 'y_pos') with width and height: 'width' and 'height'.
         'text' will appear centered on the button with size 30 monospaced font.
         """
@@ -23,10 +52,11 @@ class Button:
         self.text = text
         self.x_pos, self.y_pos = x_pos, y_pos
         
-        self.surf = pygame.Surface((width, height), pygame.SRCALPHA)
+        self.surfaces = get_state_surfaces(text, width, height)
+        self.surf = self.surfaces[palette.button]
         
-        self.font = pygame.font.SysFont("monospaced", 30)
         self.hovered = False
+        self.pressed = False
         
     def update(self, mouse_x: int, mouse_y: int) -> None:
         """ Update this button's state to interact with the 
@@ -38,17 +68,12 @@ class Button:
                         0 < mouse_y - self.y_pos < self.get_height())
         self.pressed = self.hovered and pygame.mouse.get_pressed()[0]
         
-        # Update background
+        # Swap to the surface of the new state
         color = (palette.pressed_button if self.pressed else
                  palette.hovered_button if self.hovered else
                  palette.button)
         
-        pygame.draw.rect(self.surf, color, (0, 0, self.get_width(), self.get_height()), 0, 25)
-        
-        # Update text
-        text = self.font.render(self.text, True, palette.text)
-        self.surf.blit(text, ((self.get_width() - text.get_width()) / 2,
-                              (self.get_height() - text.get_height()) / 2))
+        self.surf = self.surfaces[color]
     
     
     def draw(self, win: pygame.Surface) -> None:
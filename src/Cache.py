@@ -0,0 +1,157 @@
+import os
+import json
+import threading
+from collections import OrderedDict
+
+
+def get_symmetries(squares: bytes, size: int) -> list[bytes]:
+    """ Returns the row by row 'squares' of a board with 'size' rows and columns
+    for each of the 8 ways to rotate and flip it.
+    """
+
+    flipped = b"".join(squares[row*size:(row + 1)*size] for row in range(size - 1, -1, -1))
+    symmetries = []
+    for form in (squares, flipped):
+        transposed = b"".join(form[column::size] for column in range(size))
+        # Reversing the squares turns the board halfway around
+        symmetries += [form, form[::-1], transposed, transposed[::-1]]
+
+    return symmetries
+
+
+def get_canonical_form(board: list[list[int]]) -> bytes:
+    """ Returns the same key for every board that is a rotation, reflection or
+    recolouring of 'board': the smallest of its 8 symmetries with cities numbered
+    in the order they appear. Squares outside of every city are all treated as empty.
+    """
+
+    size = len(board)
+    squares = bytes([city if 0 < city <= size else 0 for row in board for city in row])
+
+    cities = set(squares)
+    cities.discard(0)
+
+    best = None
+    for form in get_symmetries(squares, size):
+        # Number cities in the order they appear
+        labels = bytearray(256)
+        for label, city in enumerate(sorted(cities, key=form.find), 1):
+            labels[city] = label
+
+        form = form.translate(labels)
+        if best is None or form < best:
+            best = form
+
+    return bytes([size]) + best
+
+
+class SolutionCache:
+
+    capacity: int
+    path: str | None
+
+    entries: OrderedDict[bytes, tuple[int, bool]]
+    hits: int
+    misses: int
+
+    def __init__(self, capacity: int = 4096, path: str = None) -> None:
+        """ Create a cache of solution counts holding up to 'capacity' boards, dropping the least recently used.
+        Boards that are rotations, reflections or recolourings of each other share an entry.
+        If 'path' is set the cache is loaded from it now and written to it by 'save'.
+        """
+
+        self.capacity = capacity
+        self.path = path
+
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+        # Workshop analysis counts solutions on its own thread
+        self.lock = threading.Lock()
+
+        if path:
+            self.load()
+
+    def lookup(self, key: bytes, cap: int = 0) -> int | None:
+        """ Returns the solution count of the board with canonical form 'key', stopping at 'cap' if it is set,
+        or None if the cache cannot tell.
+        """
+
+        with self.lock:
+            entry = self.entries.get(key)
+
+            if entry is not None:
+                count, exact = entry
+                # A count that hit a cap is only a lower bound
+                if exact or (cap and count >= cap):
+                    self.entries.move_to_end(key)
+                    self.hits += 1
+                    return min(count, cap) if cap else count
+
+            self.misses += 1
+            return None
+
+    def store(self, key: bytes, cap: int, count: int) -> None:
+        """ Remember that the board with canonical form 'key' has 'count' solutions when stopping at 'cap'.
+        """
+
+        exact = not cap or count < cap
+
+        with self.lock:
+            # Never replace an exact count with a lower bound
+            entry = self.entries.get(key)
+            if entry is not None and (entry[1] or entry[0] >= count) and not exact:
+                self.entries.move_to_end(key)
+                return
+
+            self.entries[key] = (count, exact)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.capacity:
+                self.entries.popitem(last=False)
+
+    def get_stats(self) -> dict[str, int | float]:
+        """ Returns the amount of hits, misses and entries along with the hit rate.
+        """
+
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self.entries),
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def load(self) -> None:
+        """ Add the entries saved at 'path' to the cache.
+        """
+
+        try:
+            with open(self.path, "r") as file:
+                saved = json.load(file)
+        except (OSError, ValueError):
+            return
+
+        # A file of the wrong shape is ignored like a damaged one
+        if not isinstance(saved, list) or not all(isinstance(entry, list) and len(entry) == 3 for entry in saved):
+            return
+        try:
+            entries = [(bytes(key), (int(count), bool(exact))) for key, count, exact in saved[-self.capacity:]]
+        except (TypeError, ValueError):
+            return
+
+        self.entries.update(entries)
+
+    def save(self) -> None:
+        """ Write every entry, least recently used first, to 'path' if it is set.
+        """
+
+        if not self.path:
+            return
+
+        with self.lock:
+            entries = [[list(key), count, exact] for key, (count, exact) in self.entries.items()]
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "w") as file:
+            json.dump(entries, file)
@@ -5,4 +5,9 @@ HOME = 0
 GAME = 1
 END = 2
 CUSTOM = 3
-WORKSHOP = 4
\ No newline at end of file
+WORKSHOP = 4
+
+# Frame scheduling
+
+FIXED_RATE = 0
+EVENT_DRIVEN = 1
@@ -0,0 +1,14 @@
+import pygame
+
+# Every font in use, shared by all widgets
+fonts = {}
+
+
+def get_font(name: str, size: int) -> pygame.font.Font:
+    """ Returns the system font 'name' at 'size', only looking it up the first time.
+    """
+
+    if (name, size) not in fonts:
+        fonts[(name, size)] = pygame.font.SysFont(name, size)
+
+    return fonts[(name, size)]
@@ -0,0 +1,80 @@
+from typing import Iterator
+
+class BoardGeometry:
+
+    x_pos: float
+    y_pos: float
+    board_size: int
+    square_size: float
+
+    def __init__(self, x_pos: float, y_pos: float, size: float, board_size: int) -> None:
+        """ Create the layout of a board with 'board_size' rows and columns drawn 'size' pixels wide
+        with its top left corner at ('x_pos', 'y_pos') on the screen.
+        """
+
+        self.x_pos, self.y_pos = x_pos, y_pos
+        self.board_size = board_size
+        self.square_size = size / board_size
+
+    def get_cell(self, x: float, y: float) -> tuple[int, int]:
+        """ Returns the column and row pixel ('x', 'y') falls in, even when it is outside the board.
+        """
+
+        return (int((x - self.x_pos) // self.square_size),
+                int((y - self.y_pos) // self.square_size))
+
+
+    def contains(self, column: int, row: int) -> bool:
+        """ Returns True if 'column' and 'row' are on the board.
+        """
+
+        return 0 <= column < self.board_size and 0 <= row < self.board_size
+
+
+    def get_square(self, x: float, y: float) -> tuple[int, int] | None:
+        """ Returns the column and row of the square pixel ('x', 'y') is strictly inside of,
+        or None if it is outside the board or on the edge of a square.
+        """
+
+        column, row = self.get_cell(x, y)
+        if not self.contains(column, row):
+            return None
+
+        # Points on the edge between two squares belong to neither
+
+        if (x - self.x_pos == self.square_size*column or
+            y - self.y_pos == self.square_size*row):
+            return None
+
+        return column, row
+
+
+    def get_squares_between(self, start: tuple[float, float], end: tuple[float, float]) -> Iterator[tuple[int, int]]:
+        """ Yields the column and row of every square on the line from pixel 'start' to pixel 'end' in order,
+        so dragging quickly over the board still reaches every square in between.
+        """
+
+        column, row = self.get_cell(*start)
+        end_column, end_row = self.get_cell(*end)
+
+        # Bresenham's line algorithm over squares instead of pixels
+
+        d_column = abs(end_column - column)
+        d_row = -abs(end_row - row)
+        step_column = 1 if column < end_column else -1
+        step_row = 1 if row < end_row else -1
+        error = d_column + d_row
+
+        while True:
+            if self.contains(column, row):
+                yield column, row
+            if column == end_column and row == end_row:
+                return
+
+            doubled = 2*error
+            if doubled >= d_row:
+                error += d_row
+                column += step_column
+            if doubled <= d_column:
+                error += d_column
+                row += step_row
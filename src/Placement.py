@@ -0,0 +1,207 @@
+import random
+
+# Every table made so far by board size. They take a few milliseconds at most, less than reading them back would
+tables = {}
+
+
+# A placement is built by inserting the columns 1, 2, ..., size into a list of rows one at a time.
+# Two capitals touch iff their columns differ by 1 and they are in neighbouring rows, called a touching pair.
+# After inserting column m the only things that decide how the placement can continue are:
+#   touching: the amount of touching pairs
+#   paired: 1 iff column m is in a touching pair with column m - 1
+#   ends: the amount of ends of the list column m is next to (2 when m = 1)
+# Inserting column m + 1 into each kind of gap between rows changes that state like so:
+def get_moves(m: int, touching: int, paired: int, ends: int) -> list[tuple[int, tuple[int, int, int]]]:
+    """ Returns every kind of gap column 'm' + 1 can be inserted into as the amount of
+    those gaps along with the state after inserting into one of them.
+    """
+
+    inner_next_to_m = 2 - ends
+    return [
+        # At an end next to column m
+        (ends, (touching + 1, 1, 1)),
+        # At an end away from column m
+        (2 - ends, (touching, 0, 1)),
+        # Splitting column m from column m - 1
+        (paired, (touching, 1, 0)),
+        # Next to column m away from the ends
+        (inner_next_to_m - paired, (touching + 1, 1, 0)),
+        # Splitting any other touching pair
+        (touching - paired, (touching - 1, 0, 0)),
+        # Anywhere else
+        ((m - 1) - inner_next_to_m - (touching - paired), (touching, 0, 0)),
+    ]
+
+
+def create_table(size: int) -> list[dict[tuple[int, int, int], int]]:
+    """ Returns, for every amount of inserted columns m, the amount of ways to finish a placement
+    with 'size' rows and columns without any touching pairs from each state after inserting column m.
+    """
+
+    table = [{} for m in range(size + 1)]
+    table[size] = {(0, 0, ends): 1 for ends in range(3)}
+
+    for m in range(size - 1, 0, -1):
+        # Every touching pair left over needs its own later insertion to split it
+        for touching in range(min(m - 1, size - m) + 1):
+            for paired in range(min(touching, 1) + 1):
+                for ends in range(3):
+                    ways = sum(count*table[m + 1].get(state, 0)
+                               for count, state in get_moves(m, touching, paired, ends) if count > 0)
+                    if ways:
+                        table[m][(touching, paired, ends)] = ways
+
+    return table
+
+
+def get_table(size: int) -> list[dict[tuple[int, int, int], int]]:
+    """ Returns the table 'create_table' makes for 'size', creating it the first time.
+    """
+
+    if size not in tables:
+        tables[size] = create_table(size)
+
+    return tables[size]
+
+
+def count_placements(size: int) -> int:
+    """ Returns the amount of ways to place a capital in every row and column of a board
+    with 'size' rows and columns without any of them touching.
+    """
+
+    return get_table(size)[1].get((0, 0, 2), 0)
+
+
+def sample_placement(size: int) -> list[tuple[int, int]]:
+    """ Returns the column and row of a capital in every row and column of a board with 'size'
+    rows and columns where none of them touch. Every valid placement is equally likely.
+    """
+
+    table = get_table(size)
+    if not table[1]:
+        raise ValueError(f"No placement exists for a board of size {size}")
+
+    # The rows as a linked list of columns, so inserting is constant time.
+    # A gap is named by the column before it, or 0 for the start of the list
+    following = [None] * (size + 1)
+    previous = [None] * (size + 1)
+    following[0], previous[1] = 1, 0
+    last = 1
+
+    # Gaps between touching columns, kept in a list with their positions so any one can be picked or dropped at once
+    touching_gaps = []
+    touching_index = {}
+
+    def add_touching(gap: int) -> None:
+        touching_index[gap] = len(touching_gaps)
+        touching_gaps.append(gap)
+
+    def remove_touching(gap: int) -> None:
+        index = touching_index.pop(gap)
+        moved = touching_gaps.pop()
+        if moved != gap:
+            touching_gaps[index] = moved
+            touching_index[moved] = index
+
+    state = (0, 0, 2)
+    for m in range(1, size):
+        touching, paired, ends = state
+
+        # Pick the kind of gap weighted by how many placements each one can still finish
+        moves = get_moves(m, touching, paired, ends)
+        weights = [count*table[m + 1].get(after, 0) if count > 0 else 0 for count, after in moves]
+        pick = random.randrange(sum(weights))
+        for kind, weight in enumerate(weights):
+            if pick < weight:
+                break
+            pick -= weight
+
+        # Then pick one gap of that kind uniformly
+        if kind <= 1:
+            gap = random.choice([gap for gap in (0, last) if get_gap_kind(gap, following, m) == kind])
+        elif kind == 4:
+            # Splitting a touching pair that does not hold column m, the one holding it is kind 2
+            while True:
+                gap = random.choice(touching_gaps)
+                if get_gap_kind(gap, following, m) == kind:
+                    break
+        elif kind <= 3:
+            gap = random.choice([gap for gap in (previous[m], m) if get_gap_kind(gap, following, m) == kind])
+        else:
+            # Most inner gaps are this kind, so trying random ones finishes quickly
+            while True:
+                gap = random.randint(1, m)
+                if gap != last and get_gap_kind(gap, following, m) == kind:
+                    break
+
+        # Insert column m + 1 into the gap
+        after = following[gap]
+        if gap and after is not None and abs(gap - after) == 1:
+            remove_touching(gap)
+
+        column = m + 1
+        following[gap], previous[column], following[column] = column, gap, after
+        if after is None:
+            last = column
+        else:
+            previous[after] = column
+
+        if gap == m:
+            add_touching(gap)
+        if after == m:
+            add_touching(column)
+
+        state = moves[kind][1]
+
+    columns = []
+    column = following[0]
+    while column is not None:
+        columns.append(column)
+        column = following[column]
+
+    return [(column - 1, row) for row, column in enumerate(columns)]
+
+
+def get_gap_kind(gap: int, following: list[int | None], m: int) -> int:
+    """ Returns the index into 'get_moves' of inserting column 'm' + 1 into 'gap' of the linked rows 'following'
+    made by 'sample_placement'.
+    """
+
+    before = gap or None
+    after = following[gap]
+    next_to_m = m in (before, after)
+
+    if before is None or after is None:
+        return 0 if next_to_m else 1
+    if abs(before - after) == 1:
+        return 2 if next_to_m else 4
+    return 3 if next_to_m else 5
+
+
+def search_placement(size: int) -> list[tuple[int, int]]:
+    """ Returns the column and row of a capital in every row and column of a board with 'size'
+    rows and columns where none of them touch, found by a randomized search row by row that
+    backs up whenever a row has no column left. Placements are not equally likely: the search favours
+    ones that leave few other placements open, which makes boards with a single solution more common.
+    """
+
+    capitals = []
+    used = set()
+    invalid_locations = [set() for _ in range(size)]
+    while len(capitals) < size:
+        last_column = -2 if not capitals else capitals[-1][0]
+        open_columns = [column for column in range(size)
+                        if column not in used and abs(last_column - column) > 1
+                        and column not in invalid_locations[len(capitals)]]
+        if not open_columns:
+            # Not a valid combination of capitals so go back
+            invalid_locations[len(capitals) - 1].add(last_column)
+            invalid_locations[len(capitals)].clear()
+            used.discard(capitals.pop()[0])
+            continue
+
+        column = random.choice(open_columns)
+        capitals.append((column, len(capitals)))
+        used.add(column)
+
+    return capitals
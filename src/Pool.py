@@ -0,0 +1,135 @@
+import os
+import json
+import queue
+import random
+import multiprocessing
+from collections import deque
+
+import src.Board as Board
+
+
+def fill_boards(tasks: multiprocessing.Queue, results: multiprocessing.Queue, refilling: multiprocessing.Event) -> None:
+    """ Worker process loop: create a single solution board for every size taken from 'tasks'
+    and put it on 'results', waiting while 'refilling' is cleared.
+    """
+
+    # Every worker needs its own random stream
+    random.seed()
+
+    while True:
+        board_size = tasks.get()
+        refilling.wait()
+        results.put((board_size, Board.create_single_solution_board(board_size)))
+
+
+class PuzzlePool:
+
+    path: str
+    sizes: range
+    capacity: int
+
+    boards: dict[int, deque[Board.Board]]
+    pending: dict[int, int]
+
+    def __init__(self, path: str = "data/puzzle-pool.json", sizes: range = range(4, 13),
+                 capacity: int = 3, workers: int = None) -> None:
+        """ Create a pool of ready single solution boards for every size in 'sizes', keeping up to
+        'capacity' of each. 'workers' processes (one less than the cpu count by default) create new boards
+        in the background while refilling. Leftover boards are saved to and loaded from 'path'.
+        """
+
+        self.path = path
+        self.sizes = sizes
+        self.capacity = capacity
+
+        self.boards = {board_size: deque() for board_size in sizes}
+        self.pending = {board_size: 0 for board_size in sizes}
+        self.load()
+
+        # Spawn rather than fork so workers do not inherit pygame's state
+        context = multiprocessing.get_context("spawn")
+        self.tasks = context.Queue()
+        self.results = context.Queue()
+        self.refilling = context.Event()
+        self.workers = [context.Process(target=fill_boards, args=(self.tasks, self.results, self.refilling), daemon=True)
+                        for _ in range(workers or max(1, (os.cpu_count() or 1) - 1))]
+        for worker in self.workers:
+            worker.start()
+
+    def load(self) -> None:
+        """ Add the boards saved at 'path' to the pool.
+        """
+
+        try:
+            with open(self.path, "r") as file:
+                saved = json.load(file)
+        except (OSError, ValueError):
+            return
+
+        for board_size, boards in saved.items():
+            board_size = int(board_size)
+            if board_size not in self.boards:
+                continue
+            for board in boards[:self.capacity]:
+                if len(board) == board_size and all(len(row) == board_size for row in board):
+                    self.boards[board_size].append(Board.Board.from_list(board))
+
+    def save(self) -> None:
+        """ Write every ready board in the pool to 'path'.
+        """
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "w") as file:
+            json.dump({board_size: [board.to_list() for board in boards] for board_size, boards in self.boards.items()}, file)
+
+    def refill(self) -> None:
+        """ Let the workers create boards, collect the ones they finished and
+        ask for more of every size below 'capacity'. Never blocks.
+        """
+
+        if not self.refilling.is_set():
+            self.refilling.set()
+
+        self.collect()
+
+        # Queue up sizes that are running low
+        for board_size in self.sizes:
+            while len(self.boards[board_size]) + self.pending[board_size] < self.capacity:
+                self.tasks.put(board_size)
+                self.pending[board_size] += 1
+
+    def collect(self) -> None:
+        """ Add every board the workers have finished to the pool. Never blocks.
+        """
+
+        while True:
+            try:
+                board_size, board = self.results.get_nowait()
+            except queue.Empty:
+                return
+            self.pending[board_size] -= 1
+            self.boards[board_size].append(board)
+
+    def pause(self) -> None:
+        """ Stop the workers from starting new boards until the next 'refill'.
+        """
+
+        if self.refilling.is_set():
+            self.refilling.clear()
+
+    def pop(self, board_size: int) -> Board.Board | None:
+        """ Return a ready board with 'board_size' rows and columns, or None if there are none left.
+        """
+
+        if self.boards.get(board_size):
+            return self.boards[board_size].popleft()
+        return None
+
+    def close(self) -> None:
+        """ Stop the workers and save the leftover boards for next time.
+        """
+
+        self.collect()
+        for worker in self.workers:
+            worker.terminate()
+        self.save()
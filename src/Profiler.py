@@ -0,0 +1,168 @@
+import json
+import time
+from collections import deque
+
+import pygame
+
+import src.Palette as palette
+from src.Fonts import get_font
+
+
+class FrameProfiler:
+
+    PHASES = ("events", "update", "draw", "flip")
+
+    enabled: bool
+    window: int
+    bucket_ms: float
+    buckets: int
+
+    frames: deque[tuple[int, float, float, float, float, float]]
+    solver_calls: deque[tuple[str, str, float]]
+
+    frame_start: float
+    phase_start: float
+    phase_times: dict[str, float]
+
+    def __init__(self, enabled: bool = True, window: int = 120, bucket_ms: float = 2, buckets: int = 17,
+                 limit: int = 100000) -> None:
+        """ Time every phase of every frame while 'enabled', keeping the last 'limit' frames and solver calls to export.
+        The overlay shows the last 'window' frames, with frame times in 'buckets' bars 'bucket_ms' milliseconds wide
+        where the last one holds every slower frame.
+        """
+
+        self.enabled = enabled
+        self.window = window
+        self.bucket_ms = bucket_ms
+        self.buckets = buckets
+
+        self.frames = deque(maxlen=limit)
+        self.solver_calls = deque(maxlen=limit)
+
+        self.frame_start = self.phase_start = 0.0
+        self.phase_times = {}
+
+    def begin_frame(self) -> None:
+        """ Start timing a new frame.
+        """
+
+        if not self.enabled:
+            return
+
+        self.frame_start = self.phase_start = time.perf_counter()
+        self.phase_times = {}
+
+
+    def mark(self, phase: str) -> None:
+        """ Record the time since the last mark, or the start of the frame, as 'phase'.
+        """
+
+        if not self.enabled:
+            return
+
+        now = time.perf_counter()
+        self.phase_times[phase] = self.phase_times.get(phase, 0.0) + now - self.phase_start
+        self.phase_start = now
+
+
+    def end_frame(self, screen: int) -> None:
+        """ Finish timing the frame drawn on 'screen'.
+        """
+
+        if not self.enabled:
+            return
+
+        self.frames.append((screen, *(self.phase_times.get(phase, 0.0) for phase in FrameProfiler.PHASES),
+                            time.perf_counter() - self.frame_start))
+
+
+    def record_solver(self, caller: str, engine: str, seconds: float) -> None:
+        """ Record a solver run by 'engine' for 'caller' that took 'seconds'. Safe to call from any thread.
+        """
+
+        if self.enabled:
+            self.solver_calls.append((caller, engine, seconds))
+
+
+    def get_recent_frames(self) -> list[tuple[int, float, float, float, float, float]]:
+        """ Returns the last 'window' frames.
+        """
+
+        start = max(0, len(self.frames) - self.window)
+        return [self.frames[i] for i in range(start, len(self.frames))]
+
+
+    def get_histogram(self) -> list[int]:
+        """ Returns the amount of recent frames whose total time falls in each bucket.
+        """
+
+        histogram = [0] * self.buckets
+        for frame in self.get_recent_frames():
+            histogram[min(int(frame[-1]*1000 / self.bucket_ms), self.buckets - 1)] += 1
+
+        return histogram
+
+
+    def get_summary(self) -> dict[str, float]:
+        """ Returns the average milliseconds of each phase and of the whole frame over the recent frames,
+        along with the slowest frame.
+        """
+
+        frames = self.get_recent_frames()
+        if not frames:
+            return {}
+
+        summary = {phase: 1000*sum(frame[i + 1] for frame in frames) / len(frames)
+                   for i, phase in enumerate(FrameProfiler.PHASES)}
+        summary["total"] = 1000*sum(frame[-1] for frame in frames) / len(frames)
+        summary["slowest"] = 1000*max(frame[-1] for frame in frames)
+        return summary
+
+
+    def draw(self, win: pygame.Surface) -> pygame.Rect:
+        """ Draw the recent phase times, solver calls and frame time histogram in the top left of 'win'
+        and return the area it covers.
+        """
+
+        font = get_font("monospaced", 18)
+        line_height = font.get_linesize()
+
+        lines = [f"{phase:>7} {ms:6.2f}ms" for phase, ms in self.get_summary().items()]
+        for caller, engine, seconds in list(self.solver_calls)[-3:]:
+            lines.append(f"{caller[:20]} {engine.split('_')[0]} {seconds*1000:.1f}ms")
+
+        bar_height = 40
+        surf = pygame.Surface((300, line_height*len(lines) + bar_height + 20))
+        surf.fill(palette.contrast)
+
+        for i, line in enumerate(lines):
+            surf.blit(font.render(line, True, palette.text), (10, 5 + i*line_height))
+
+        # Bars from the fastest bucket on the left to the slowest on the right
+
+        histogram = self.get_histogram()
+        tallest = max(histogram) or 1
+        width = (surf.get_width() - 20) / self.buckets
+        bottom = surf.get_height() - 10
+        for i, count in enumerate(histogram):
+            height = bar_height * count / tallest
+            pygame.draw.rect(surf, palette.invalid if i == self.buckets - 1 else palette.button,
+                             (10 + i*width, bottom - height, width - 1, height))
+
+        return win.blit(surf, (0, 0))
+
+
+    def export(self, path: str) -> None:
+        """ Write every kept frame and solver call as JSON to 'path'.
+        """
+
+        with open(path, "w") as file:
+            json.dump({
+                "phases": list(FrameProfiler.PHASES),
+                "frames": [{"screen": frame[0], "total": frame[-1],
+                            **{phase: frame[i + 1] for i, phase in enumerate(FrameProfiler.PHASES)}}
+                           for frame in self.frames],
+                "solver_calls": [{"caller": caller, "engine": engine, "seconds": seconds}
+                                 for caller, engine, seconds in self.solver_calls],
+                "histogram": {"bucket_ms": self.bucket_ms, "counts": self.get_histogram()},
+            }, file)
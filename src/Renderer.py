@@ -0,0 +1,166 @@
+from functools import lru_cache
+
+import pygame
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+import src.Palette as palette
+
+
+def get_index_surface(board: list[list[int]]) -> pygame.Surface:
+    """ Returns a surface with one 8 bit pixel per square of 'board' whose palette
+    is 'palette.board_colors', so each pixel is just the index of its city's colour.
+    """
+
+    size = len(board)
+
+    if numpy is not None:
+        surf = pygame.Surface((size, size), depth=8)
+        # Surfaces are indexed by column first
+        pygame.surfarray.pixels2d(surf)[:] = (numpy.array(board, dtype=numpy.int16).T - 1) % len(palette.board_colors)
+    else:
+        indices = bytes((city - 1) % len(palette.board_colors) for row in board for city in row)
+        surf = pygame.image.frombytes(indices, (size, size), "P")
+
+    surf.set_palette(palette.board_colors)
+    return surf
+
+
+@lru_cache(maxsize=32)
+def get_grid(board_size: int, size: int) -> pygame.Surface:
+    """ Returns a transparent 'size' by 'size' surface with the borders of every square
+    of a board with 'board_size' rows and columns drawn on it.
+    """
+
+    square_size = size / board_size
+
+    # A colour key blits much faster than per pixel alpha
+    grid = pygame.Surface((size, size))
+    grid.fill((255, 0, 255))
+    grid.set_colorkey((255, 0, 255))
+
+    for row in range(board_size):
+        for column in range(board_size):
+            pygame.draw.rect(grid, palette.board_border,
+                            (square_size*column, square_size*row, square_size + 1, square_size + 1), 2)
+
+    return grid
+
+
+def rasterize_board(board: list[list[int]], size: int, grid: bool = True) -> pygame.Surface:
+    """ Returns 'board' drawn on a 'size' by 'size' surface, with the borders of its squares if 'grid' is set.
+    Costs about the same no matter how many squares 'board' has.
+    """
+
+    surf = pygame.Surface((size, size))
+    surf.blit(pygame.transform.scale(get_index_surface(board), (size, size)), (0, 0))
+
+    if grid:
+        surf.blit(get_grid(len(board), size), (0, 0))
+
+    return surf
+
+
+class BoardRenderer:
+
+    board: list[list[int]]
+    square_size: float
+
+    surf: pygame.Surface
+    static: pygame.Surface
+    highlight: pygame.Surface
+
+    drawn: list[list[tuple[bool, int, tuple[int, int, int] | None]]]
+
+    def __init__(self, board: list[list[int]], size: int) -> None:
+        """ Create a renderer that keeps 'board' drawn on its own 'size' by 'size' surface.
+        Cell colours and borders are drawn once, after that 'update' only redraws the squares that changed.
+        """
+
+        self.board = board
+        self.square_size = size / len(board)
+
+        self.surf = pygame.Surface((size, size))
+        self.static = rasterize_board(board, size)
+
+        self.highlight = pygame.Surface((self.square_size, self.square_size), pygame.SRCALPHA)
+        self.highlight.fill((255, 255, 255, 100))
+
+        # Nothing has been drawn over the static layer yet
+        self.drawn = [[(False, 0, None) for _ in row] for row in board]
+
+        self.surf.blit(self.static, (0, 0))
+
+    def get_rect(self, column: int, row: int) -> pygame.Rect:
+        """ Returns the area of 'surf' the square on 'column' and 'row' can draw on, border included.
+        Neighbouring squares only share the line of border between them.
+        """
+
+        x = int(self.square_size*column)
+        y = int(self.square_size*row)
+        width = int(self.square_size*(column + 1)) - x + 1
+        height = int(self.square_size*(row + 1)) - y + 1
+
+        return pygame.Rect(x, y, width, height).clip(self.surf.get_rect())
+
+
+    def update(self, states: list[list[tuple[bool, int, tuple[int, int, int] | None]]]) -> list[pygame.Rect]:
+        """ Redraw every square whose state changed since it was last drawn and return the areas of 'surf' that changed.
+        'states' holds whether each square is highlighted, its mark and the colour of its capital (None if it has none).
+        """
+
+        rects = []
+        for row, (states_row, drawn_row) in enumerate(zip(states, self.drawn)):
+            if states_row == drawn_row:
+                continue
+
+            for column, state in enumerate(states_row):
+                if state != drawn_row[column]:
+                    rects.append(self.draw_square(column, row, state))
+
+        return rects
+
+
+    def draw_square(self, column: int, row: int, state: tuple[bool, int, tuple[int, int, int] | None]) -> pygame.Rect:
+        """ Draw the square on 'column' and 'row' in 'state' over the static layer and return the area it covers.
+        """
+
+        highlighted, mark, color = state
+        self.drawn[row][column] = state
+
+        x = self.square_size*column
+        y = self.square_size*row
+
+        # Start from the static square so nothing from its last state is left
+
+        rect = self.get_rect(column, row)
+        self.surf.blit(self.static, rect, rect)
+
+        # Highlight if hovered
+
+        if highlighted:
+            self.surf.blit(self.highlight, (x, y))
+            pygame.draw.rect(self.surf, palette.board_border,
+                            (x, y, self.square_size + 1, self.square_size + 1), 2)
+
+        # Draw X
+
+        if mark == 1:
+            pygame.draw.line(self.surf, palette.board_border,
+                            (x + self.square_size/6, y + self.square_size/6),
+                            (x + self.square_size*5/6, y + self.square_size*5/6), 10)
+            pygame.draw.line(self.surf, palette.board_border,
+                            (x + self.square_size*5/6, y + self.square_size/6),
+                            (x + self.square_size/6, y + self.square_size*5/6), 10)
+
+        # Draw Capital
+
+        elif mark == 2:
+            pygame.draw.rect(self.surf, color,
+                             (x + self.square_size/6, y + self.square_size/6,
+                              self.square_size*2/3, self.square_size*2/3), 10)
+
+        return rect
@@ -0,0 +1,480 @@
+from typing import Callable
+from functools import lru_cache
+
+from src.Stats import SolverStats
+
+
+def get_city_masks(board: list[list[int]]) -> list[int]:
+    """ Returns a bitmask for each city on 'board' where bit (row * size + column)
+    is set iff the square at 'column' and 'row' belongs to that city.
+    """
+
+    size = len(board)
+    masks = [0 for city in range(size)]
+    for row, squares in enumerate(board):
+        for column, city in enumerate(squares):
+            if 0 < city <= size:
+                masks[city - 1] |= 1 << (row*size + column)
+
+    return masks
+
+
+@lru_cache(maxsize=None)
+def get_conflict_masks(size: int) -> tuple[int, ...]:
+    """ Returns a bitmask for each square of a board with 'size' rows and columns
+    covering every square a capital placed there rules out: its row, its column and its neighbours.
+    """
+
+    row_mask = (1 << size) - 1
+    column_mask = sum(1 << (row*size) for row in range(size))
+
+    conflicts = []
+    for row in range(size):
+        for column in range(size):
+            mask = (row_mask << (row*size)) | (column_mask << column)
+            for r in range(max(0, row - 1), min(size, row + 2)):
+                for c in range(max(0, column - 1), min(size, column + 2)):
+                    mask |= 1 << (r*size + c)
+            conflicts.append(mask)
+
+    return tuple(conflicts)
+
+
+@lru_cache(maxsize=None)
+def get_line_masks(size: int) -> tuple[tuple[int, int], ...]:
+    """ Returns a bitmask of the row and one of the column of each square of a board with 'size' rows and columns.
+    """
+
+    row_mask = (1 << size) - 1
+    column_mask = sum(1 << (row*size) for row in range(size))
+
+    return tuple((row_mask << (row*size), column_mask << column) for row in range(size) for column in range(size))
+
+
+def add_conflicts(stats: SolverStats, ruled_out: int, lines: tuple[int, int]) -> None:
+    """ Count every square in the bitmask 'ruled_out' as a conflict in 'stats', where 'lines' holds the rows
+    and the columns of every placed capital and squares outside them are ruled out by a neighbouring capital.
+    Squares in both a placed capital's row and another's column count as column conflicts.
+    """
+
+    rows, columns = lines
+    stats.conflicts["column"] += (ruled_out & columns).bit_count()
+    stats.conflicts["row"] += (ruled_out & rows & ~columns).bit_count()
+    stats.conflicts["adjacency"] += (ruled_out & ~(rows | columns)).bit_count()
+
+
+def try_capital_bits(solutions: list[int], nodes: list[int], cities: list[int], conflicts: tuple[int, ...],
+                     cap: int, blocked: int, depth: int, stats: SolverStats = None, lines: tuple[int, int] = (0, 0)) -> None:
+    """ Increases the first element in 'solutions' by the amount of possible solutions
+    using the city bitmasks in 'cities', where 'blocked' holds every square already ruled out.
+    The first element in 'nodes' counts every call, as does 'stats' if it is set.
+    'lines' holds the rows and the columns of the placed capitals, and is only kept up to date for 'stats'.
+
+    Prerequisites:
+        blocked = 0
+        depth = 0
+    """
+
+    nodes[0] += 1
+    if stats is not None:
+        stats.visit(depth)
+
+    # Found a possible solution! Try to find another
+    if depth == len(cities):
+        solutions[0] += 1
+        if stats is not None:
+            stats.add_solution()
+        return
+
+    # Guess and check every square in this city that no placed capital rules out
+    open_squares = cities[depth] & ~blocked
+    if stats is not None:
+        add_conflicts(stats, cities[depth] & blocked, lines)
+
+    while open_squares:
+        square = open_squares & -open_squares
+        open_squares ^= square
+        position = square.bit_length() - 1
+
+        if stats is None:
+            try_capital_bits(solutions, nodes, cities, conflicts, cap, blocked | conflicts[position], depth + 1)
+        else:
+            row, column = get_line_masks(len(cities))[position]
+            try_capital_bits(solutions, nodes, cities, conflicts, cap, blocked | conflicts[position], depth + 1,
+                             stats, (lines[0] | row, lines[1] | column))
+
+        # End the recurssion once 'cap' possibilities are found
+        if cap and solutions[0] >= cap:
+            return
+
+
+def bitboard_solutions(board: list[list[int]], cap: int = 0, nodes: list[int] = None,
+                       stats: SolverStats = None) -> int:
+    """ Returns the amount of possible solutions to 'board', stopping at 'cap' if it is set.
+    The first element in 'nodes' is increased by the amount of squares tried, if given.
+    'stats' records every node, conflict and solution, if given.
+    """
+
+    # Smaller cities first, just like the recursive solver
+    cities = sorted(get_city_masks(board), key=int.bit_count)
+    if stats is not None:
+        stats.count_conflicts()
+
+    solutions = [0]
+    try_capital_bits(solutions, nodes or [0], cities, get_conflict_masks(len(board)), cap, 0, 0, stats)
+
+    return solutions[0]
+
+
+def try_capital_positions(solutions: list[int], cities: list[int], conflicts: tuple[int, ...],
+                          cap: int, blocked: int, placed: int, depth: int, stats: SolverStats = None,
+                          lines: tuple[int, int] = (0, 0)) -> None:
+    """ Appends the squares of every possible solution using the city bitmasks in 'cities' to 'solutions'
+    as a bitmask, where 'blocked' holds every square already ruled out and 'placed' every capital so far.
+    'stats' records every node, conflict and solution, if given, see 'try_capital_bits' for 'lines'.
+
+    Prerequisites:
+        blocked = 0
+        placed = 0
+        depth = 0
+    """
+
+    if stats is not None:
+        stats.visit(depth)
+
+    # Found a possible solution! Try to find another
+    if depth == len(cities):
+        solutions.append(placed)
+        if stats is not None:
+            stats.add_solution()
+        return
+
+    # Guess and check every square in this city that no placed capital rules out
+    open_squares = cities[depth] & ~blocked
+    if stats is not None:
+        add_conflicts(stats, cities[depth] & blocked, lines)
+
+    while open_squares:
+        square = open_squares & -open_squares
+        open_squares ^= square
+        position = square.bit_length() - 1
+
+        if stats is None:
+            try_capital_positions(solutions, cities, conflicts, cap, blocked | conflicts[position],
+                                  placed | square, depth + 1)
+        else:
+            row, column = get_line_masks(len(cities))[position]
+            try_capital_positions(solutions, cities, conflicts, cap, blocked | conflicts[position],
+                                  placed | square, depth + 1, stats, (lines[0] | row, lines[1] | column))
+
+        # End the recurssion once 'cap' possibilities are found
+        if cap and len(solutions) >= cap:
+            return
+
+
+def find_solutions(board: list[list[int]], cap: int = 0, stats: SolverStats = None) -> list[list[tuple[int, int]]]:
+    """ Returns the column and row of every capital in each possible solution to 'board',
+    stopping at 'cap' solutions if it is set.
+    'stats' records every node, conflict and solution, if given.
+    """
+
+    size = len(board)
+    cities = sorted(get_city_masks(board), key=int.bit_count)
+    if stats is not None:
+        stats.count_conflicts()
+
+    solutions = []
+    try_capital_positions(solutions, cities, get_conflict_masks(size), cap, 0, 0, 0, stats)
+
+    return [[(position % size, position // size) for position in range(size*size) if placed >> position & 1]
+            for placed in solutions]
+
+
+def get_units(board: list[list[int]]) -> tuple[list[int], list[int], list[int]]:
+    """ Returns the exact cover units of 'board': a bitmask for every row, then every column,
+    then every city, that must each hold exactly one capital. Also returns the index of the city
+    unit of each square (-1 if it is not in a city) and a bitmask of the units each square covers.
+    """
+
+    size = len(board)
+    row_mask = (1 << size) - 1
+    column_mask = sum(1 << (row*size) for row in range(size))
+
+    units = ([row_mask << (row*size) for row in range(size)] +
+             [column_mask << column for column in range(size)] +
+             get_city_masks(board))
+
+    square_units = []
+    square_cities = []
+    for row, squares in enumerate(board):
+        for column, city in enumerate(squares):
+            city = 2*size + city - 1 if 0 < city <= size else -1
+            square_cities.append(city)
+            square_units.append((1 << row) | (1 << (size + column)) | (1 << city if city >= 0 else 0))
+
+    return units, square_cities, square_units
+
+
+def propagate(units: list[int], square_cities: list[int], square_units: list[int], conflicts: tuple[int, ...],
+              open_squares: int, left: int) -> tuple[int, int] | None:
+    """ Place every forced capital and rule out every square that cannot hold one, where 'open_squares'
+    are the squares still possible and 'left' has a bit set for every unit without a capital.
+    Returns the new 'open_squares' and 'left', or None if some unit can no longer hold a capital.
+    """
+
+    size = len(units) // 3
+
+    changed = True
+    while changed:
+        changed = False
+
+        remaining = left
+        while remaining:
+            unit = remaining & -remaining
+            remaining ^= unit
+
+            # This unit was filled by a capital forced earlier in this pass
+            if not left & unit:
+                continue
+
+            index = unit.bit_length() - 1
+            options = units[index] & open_squares
+
+            # Contradiction: this row, column or city has nowhere left for its capital
+            if not options:
+                return None
+
+            square = options & -options
+            position = square.bit_length() - 1
+            city = units[square_cities[position]]
+
+            # Forced: only one square is left so the capital must go there
+            if options == square:
+                open_squares &= ~(conflicts[position] | city)
+                left &= ~square_units[position]
+                changed = True
+                continue
+
+            if index < 2*size:
+                # A row or column confined to one city holds that city's capital
+                if not options & ~city:
+                    ruled_out = city & ~units[index]
+                    if open_squares & ruled_out:
+                        open_squares &= ~ruled_out
+                        changed = True
+            else:
+                # A city confined to one row or column holds that row's or column's capital
+                for line in (units[position // size], units[size + position % size]):
+                    if not options & ~line:
+                        ruled_out = line & ~units[index]
+                        if open_squares & ruled_out:
+                            open_squares &= ~ruled_out
+                            changed = True
+
+    return open_squares, left
+
+
+def try_unit(solutions: list[int], nodes: list[int], units: list[int], square_cities: list[int],
+             square_units: list[int], conflicts: tuple[int, ...], cap: int, open_squares: int, left: int,
+             stats: SolverStats = None, depth: int = 0) -> None:
+    """ Increases the first element in 'solutions' by the amount of possible solutions where
+    the squares in 'open_squares' are still possible and every unit in 'left' still needs a capital.
+    Branches on whichever row, column or city has the fewest squares left.
+    The first element in 'nodes' counts every call, as does 'stats' at 'depth' guesses deep if it is set.
+    """
+
+    nodes[0] += 1
+    if stats is not None:
+        stats.visit(depth)
+
+    state = propagate(units, square_cities, square_units, conflicts, open_squares, left)
+    if state is None:
+        return
+    open_squares, left = state
+
+    # Found a possible solution! Try to find another
+    if not left:
+        solutions[0] += 1
+        if stats is not None:
+            stats.add_solution()
+        return
+
+    # Pick the most constrained unit
+    best_options = 0
+    best_count = len(conflicts) + 1
+    remaining = left
+    while remaining:
+        unit = remaining & -remaining
+        remaining ^= unit
+
+        options = units[unit.bit_length() - 1] & open_squares
+        if options.bit_count() < best_count:
+            best_options, best_count = options, options.bit_count()
+
+    # Guess and check every square left in that unit
+    while best_options:
+        square = best_options & -best_options
+        best_options ^= square
+        position = square.bit_length() - 1
+
+        try_unit(solutions, nodes, units, square_cities, square_units, conflicts, cap,
+                 open_squares & ~(conflicts[position] | units[square_cities[position]]),
+                 left & ~square_units[position], stats, depth + 1)
+
+        # End the recurssion once 'cap' possibilities are found
+        if cap and solutions[0] >= cap:
+            return
+
+
+def propagation_solutions(board: list[list[int]], cap: int = 0, nodes: list[int] = None,
+                          stats: SolverStats = None) -> int:
+    """ Returns the amount of possible solutions to 'board', stopping at 'cap' if it is set,
+    by treating it as an exact cover of rows, columns and cities with constraint propagation.
+    The first element in 'nodes' is increased by the amount of search nodes, if given.
+    'stats' records the nodes at every depth and when solutions are found, if given.
+    Depths count guesses since forced capitals are placed without branching,
+    and propagation rules squares out before they are tried so its conflicts are left unmeasured.
+    """
+
+    units, square_cities, square_units = get_units(board)
+    size = len(board)
+
+    # Only squares within a city can ever hold a capital
+    open_squares = 0
+    for city in units[2*size:]:
+        open_squares |= city
+
+    solutions = [0]
+    try_unit(solutions, nodes or [0], units, square_cities, square_units,
+             get_conflict_masks(size), cap, open_squares, (1 << 3*size) - 1, stats)
+
+    return solutions[0]
+
+
+def dp_solutions(board: list[list[int]], cap: int = 0, fixed: tuple[int, int] = None) -> int:
+    """ Returns the amount of possible solutions to 'board', saturating at 'cap' if it is set.
+    Goes row by row, adding up how many ways reach each (used columns, used cities, previous column)
+    instead of listing solutions one at a time, so huge counts take no longer than small ones.
+    If 'fixed' is set only solutions with a capital on that column and row are counted.
+    """
+
+    size = len(board)
+
+    # Every square that can hold a capital in each row, along with the bit of its city
+    rows = [[(column, 1 << (city - 1)) for column, city in enumerate(squares) if 0 < city <= size]
+            for squares in board]
+    if fixed:
+        column, row = fixed
+        rows[row] = [square for square in rows[row] if square[0] == column]
+
+    # Cities that appear in each row or any row below it
+    later_cities = [0 for row in range(size + 1)]
+    for row in range(size - 1, -1, -1):
+        later_cities[row] = later_cities[row + 1]
+        for column, city in rows[row]:
+            later_cities[row] |= city
+
+    # The amount of ways to place capitals in every row so far ending in each state
+    states = {(0, 0, -2): 1}
+    for row, squares in enumerate(rows):
+        next_states = {}
+        for (columns, cities, previous), ways in states.items():
+            for column, city in squares:
+                # Same column, same city or touching the capital in the row above
+                if columns >> column & 1 or cities & city or -1 <= column - previous <= 1:
+                    continue
+
+                # Forget cities no later row can clash with so more states merge
+                state = (columns | 1 << column, (cities | city) & later_cities[row + 1], column)
+                total = next_states.get(state, 0) + ways
+                next_states[state] = min(total, cap) if cap else total
+
+        states = next_states
+        if not states:
+            return 0
+
+    total = sum(states.values())
+    return min(total, cap) if cap else total
+
+
+def dp_heatmap(board: list[list[int]], cancelled: Callable[[], bool] = None) -> list[list[int]] | None:
+    """ Returns, for every square of 'board', the amount of possible solutions with a capital there.
+    Runs the row by row count of 'dp_solutions' once from the top and once from the bottom, keeping the states
+    before and after each row, so every square is counted by joining the two sides instead of a pinned run each.
+    Returns None as soon as 'cancelled' returns True, which is checked after every row.
+    """
+
+    size = len(board)
+    heatmap = [[0 for column in range(size)] for row in range(size)]
+
+    rows = [[(column, 1 << (city - 1)) for column, city in enumerate(squares) if 0 < city <= size]
+            for squares in board]
+
+    # Cities that appear in each row or any row below it, and in each row or any row above it
+    later_cities = [0 for row in range(size + 1)]
+    for row in range(size - 1, -1, -1):
+        later_cities[row] = later_cities[row + 1]
+        for column, city in rows[row]:
+            later_cities[row] |= city
+    earlier_cities = [0 for row in range(size)]
+    for row in range(size):
+        earlier_cities[row] = earlier_cities[row - 1] if row else 0
+        for column, city in rows[row]:
+            earlier_cities[row] |= city
+
+    # The states above each row, forgetting cities no later row can clash with, as in 'dp_solutions'
+    above = [{(0, 0, -2): 1}]
+    for row in range(size - 1):
+        if cancelled and cancelled():
+            return None
+        next_states = {}
+        for (columns, cities, previous), ways in above[row].items():
+            for column, city in rows[row]:
+                if columns >> column & 1 or cities & city or -1 <= column - previous <= 1:
+                    continue
+                state = (columns | 1 << column, (cities | city) & later_cities[row + 1], column)
+                next_states[state] = next_states.get(state, 0) + ways
+        if not next_states:
+            return heatmap
+        above.append(next_states)
+
+    # The states below each row, forgetting cities no earlier row can clash with
+    below = [{} for row in range(size - 1)] + [{(0, 0, -2): 1}]
+    for row in range(size - 1, 0, -1):
+        if cancelled and cancelled():
+            return None
+        for (columns, cities, following), ways in below[row].items():
+            for column, city in rows[row]:
+                if columns >> column & 1 or cities & city or -1 <= column - following <= 1:
+                    continue
+                state = (columns | 1 << column, (cities | city) & earlier_cities[row - 1], column)
+                below[row - 1][state] = below[row - 1].get(state, 0) + ways
+        if not below[row - 1]:
+            return heatmap
+
+    all_columns = (1 << size) - 1
+    for row, squares in enumerate(rows):
+        if cancelled and cancelled():
+            return None
+
+        # Ways below the row by used columns and cities, in total and by the column of the capital right below
+        joins = {}
+        for (columns, cities, following), ways in below[row].items():
+            total, by_column = joins.setdefault((columns, cities), [0, {}])
+            joins[(columns, cities)][0] = total + ways
+            by_column[following] = by_column.get(following, 0) + ways
+
+        # Every column and city is used exactly once, so the rows above and the square decide the rows below
+        for (columns, cities, previous), ways in above[row].items():
+            for column, city in squares:
+                if columns >> column & 1 or cities & city or -1 <= column - previous <= 1:
+                    continue
+                key = (all_columns ^ columns ^ 1 << column,
+                       all_columns & ~(cities | city) & later_cities[row + 1] & earlier_cities[row])
+                if key not in joins:
+                    continue
+                total, by_column = joins[key]
+                touching = sum(by_column.get(column + offset, 0) for offset in (-1, 0, 1))
+                heatmap[row][column] += ways * (total - touching)
+
+    return heatmap
@@ -0,0 +1,134 @@
+import time
+
+
+class SolverStats:
+
+    start: float
+
+    depth_nodes: list[int]
+    conflicts: dict[str, int | None]
+
+    found: int
+    first_solution: list[float]
+    second_solution: list[float]
+
+    def __init__(self) -> None:
+        """ Statistics about how much searching a solver needed: the nodes it visited at every depth,
+        the capitals it ruled out by each rule and how many seconds it took to find its first and second solution.
+        Conflicts stay None, as in not measured, unless the solver can tell them apart and calls 'count_conflicts'.
+        Stats of several runs can be added up with 'merge', which also makes a good 'Board.stats_collector'.
+        """
+
+        self.start = time.perf_counter()
+
+        self.depth_nodes = []
+        self.conflicts = {"row": None, "column": None, "adjacency": None}
+
+        self.found = 0
+        self.first_solution = []
+        self.second_solution = []
+
+    def visit(self, depth: int) -> None:
+        """ Count a node at 'depth', the amount of guesses made to reach it.
+        """
+
+        while len(self.depth_nodes) <= depth:
+            self.depth_nodes.append(0)
+        self.depth_nodes[depth] += 1
+
+
+    def count_conflicts(self) -> None:
+        """ Start counting conflicts by each rule from 0, unless they are counted already.
+        """
+
+        for rule, count in self.conflicts.items():
+            if count is None:
+                self.conflicts[rule] = 0
+
+
+    def add_conflict(self, column: int, row: int, cap_column: int, cap_row: int) -> None:
+        """ Count a capital on 'column' and 'row' ruled out by the capital on 'cap_column' and 'cap_row'.
+        """
+
+        if column == cap_column:
+            self.conflicts["column"] += 1
+        elif row == cap_row:
+            self.conflicts["row"] += 1
+        else:
+            self.conflicts["adjacency"] += 1
+
+
+    def add_solution(self) -> None:
+        """ Count a solution, remembering when the first two were found.
+        """
+
+        self.found += 1
+        if self.found == 1:
+            self.first_solution.append(time.perf_counter() - self.start)
+        elif self.found == 2:
+            self.second_solution.append(time.perf_counter() - self.start)
+
+
+    def merge(self, other: "SolverStats") -> None:
+        """ Add the stats of 'other' to these.
+        """
+
+        for depth, nodes in enumerate(other.depth_nodes):
+            while len(self.depth_nodes) <= depth:
+                self.depth_nodes.append(0)
+            self.depth_nodes[depth] += nodes
+
+        # Conflicts only one of them measured are kept as they are
+        if None not in other.conflicts.values():
+            self.count_conflicts()
+            for rule in self.conflicts:
+                self.conflicts[rule] += other.conflicts[rule]
+
+        self.found += other.found
+        self.first_solution += other.first_solution
+        self.second_solution += other.second_solution
+
+
+    def get_runs(self) -> int:
+        """ Returns the amount of solver runs, every one of them visits a single node at depth 0.
+        """
+
+        return self.depth_nodes[0] if self.depth_nodes else 0
+
+
+    def get_nodes(self) -> int:
+        """ Returns the amount of nodes visited.
+        """
+
+        return sum(self.depth_nodes)
+
+
+    def get_max_depth(self) -> int:
+        """ Returns the deepest depth visited.
+        """
+
+        return max(0, len(self.depth_nodes) - 1)
+
+
+    def get_branching(self) -> list[float]:
+        """ Returns the average amount of nodes below each node at every depth.
+        """
+
+        return [below / nodes if nodes else 0.0 for nodes, below in zip(self.depth_nodes, self.depth_nodes[1:])]
+
+
+    def to_dict(self) -> dict:
+        """ Returns these stats as a dictionary that can be written as JSON.
+        """
+
+        return {
+            "runs": self.get_runs(),
+            "nodes": self.get_nodes(),
+            "max_depth": self.get_max_depth(),
+            "depth_nodes": self.depth_nodes,
+            "branching": self.get_branching(),
+            "conflicts": dict(self.conflicts),
+            "solutions": self.found,
+            "first_solution": self.first_solution,
+            "second_solution": self.second_solution,
+        }
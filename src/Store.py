@@ -0,0 +1,342 @@
+import os
+import json
+import zlib
+import queue
+import threading
+from collections import OrderedDict
+
+import src.Board as Board
+
+
+def encode_record(record: dict) -> bytes:
+    """ Returns 'record' as one line of the store: a checksum of its JSON followed by the JSON itself.
+    """
+
+    data = json.dumps(record, separators=(",", ":")).encode()
+    return b"%08x " % zlib.crc32(data) + data + b"\n"
+
+
+def check_record(line: bytes) -> bytes | None:
+    """ Returns the JSON held by 'line' without reading it, or None if it was torn or damaged.
+    """
+
+    if len(line) < 10 or not line.endswith(b"\n") or line[8:9] != b" ":
+        return None
+
+    data = line[9:-1]
+    try:
+        if int(line[:8], 16) != zlib.crc32(data):
+            return None
+    except ValueError:
+        return None
+    return data
+
+
+def decode_record(line: bytes) -> dict | None:
+    """ Returns the record held by 'line', or None if it was torn or damaged.
+    """
+
+    data = check_record(line)
+    if data is None:
+        return None
+
+    try:
+        return json.loads(data)
+    except ValueError:
+        return None
+
+
+class BoardStore:
+
+    path: str
+    capacity: int
+
+    offsets: list[int | Board.Board]
+    ids: list[int]
+    next_id: int
+    loaded: OrderedDict[int, Board.Board]
+    garbage: int
+
+    def __init__(self, path: str = "data/custom-boards.log", legacy_path: str = None, capacity: int = 256) -> None:
+        """ Keep saved boards in an append only file at 'path' where every line is one checksummed record,
+        so a crash can at worst tear the last record, which is skipped the next time the store is opened.
+        Only the offset of each board is kept, or the board itself until it is written, and up to 'capacity'
+        boards are loaded at once. Every board gets an id that removals refer to, so skipping a damaged record
+        never makes a later removal delete the wrong board.
+        Records are written by a background thread, and the file is compacted once most of it is dead records.
+        If the file does not exist yet, the boards saved as a JSON list at 'legacy_path' are moved into it.
+        """
+
+        self.path = path
+        self.capacity = capacity
+
+        self.offsets = []
+        self.ids = []
+        self.next_id = 0
+        self.loaded = OrderedDict()
+        self.garbage = 0
+
+        # Reads on the main thread and writes on the writer share the file and offsets
+        self.lock = threading.Lock()
+        self.writes = queue.Queue()
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        if not os.path.exists(self.path) and legacy_path:
+            self.migrate(legacy_path)
+        self.recover()
+
+        self.writer = threading.Thread(target=self.write_records, daemon=True)
+        self.writer.start()
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def __getitem__(self, index: int) -> Board.Board:
+        """ Returns saved board 'index', reading it from the file if it is not loaded.
+        """
+
+        with self.lock:
+            if index < 0:
+                index += len(self.offsets)
+            if not 0 <= index < len(self.offsets):
+                raise IndexError("board index out of range")
+
+            if isinstance(self.offsets[index], Board.Board):
+                return self.offsets[index]
+
+            if index in self.loaded:
+                self.loaded.move_to_end(index)
+                return self.loaded[index]
+
+            with open(self.path, "rb") as file:
+                file.seek(self.offsets[index])
+                board = Board.Board.from_list(decode_record(file.readline())["board"])
+
+            self.loaded[index] = board
+            while len(self.loaded) > self.capacity:
+                self.loaded.popitem(last=False)
+
+            return board
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def append(self, board: list[list[int]]) -> None:
+        """ Save a copy of 'board' after every other board, writing it in the background.
+        """
+
+        board = Board.Board.from_list([row[:] for row in board])
+        with self.lock:
+            board_id = self.next_id
+            self.next_id += 1
+            self.offsets.append(board)
+            self.ids.append(board_id)
+
+        self.writes.put(("board", (board_id, board)))
+
+    def remove(self, index: int) -> None:
+        """ Delete saved board 'index', moving every later board down by one.
+        """
+
+        with self.lock:
+            if not 0 <= index < len(self.offsets):
+                raise IndexError("board index out of range")
+
+            self.offsets.pop(index)
+            board_id = self.ids.pop(index)
+            self.loaded.clear()
+
+        self.writes.put(("remove", board_id))
+
+    def compact(self) -> None:
+        """ Rewrite the file with only the boards still saved once every earlier write is done.
+        """
+
+        self.writes.put(("compact", None))
+
+    def flush(self) -> None:
+        """ Wait until every write so far is on disk.
+        """
+
+        self.writes.join()
+
+    def close(self) -> None:
+        """ Finish every write and stop the writer.
+        """
+
+        self.writes.put(None)
+        self.writer.join()
+
+    def migrate(self, legacy_path: str) -> None:
+        """ Write every board saved as a JSON list at 'legacy_path' into a new store file, leaving the old file as is.
+        """
+
+        try:
+            with open(legacy_path, "r") as file:
+                boards = json.load(file)
+        except (OSError, ValueError):
+            return
+
+        # Write everything under another name first so a crash never leaves half a collection behind
+        with open(self.path + ".tmp", "wb") as file:
+            for board_id, board in enumerate(boards):
+                file.write(encode_record({"id": board_id, "board": board}))
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(self.path + ".tmp", self.path)
+
+    def recover(self) -> None:
+        """ Read the offset of every board from the file, skipping damaged records and cutting off a torn end.
+        """
+
+        if not os.path.exists(self.path):
+            return
+
+        # The offset of every board still saved by its id, in the order they were saved
+        boards = {}
+        # Whether the file was written before boards had ids
+        legacy = False
+        with open(self.path, "rb+") as file:
+            offset = 0
+            # Where the damaged records at the end of the file start, if it ends with any
+            torn = None
+            for line in file:
+                data = check_record(line)
+                if data is None:
+                    self.garbage += 1
+                    torn = offset if torn is None else torn
+                    offset += len(line)
+                    continue
+                torn = None
+
+                # Only removals are read now, boards are read once they are shown and just have their id picked out
+                if data.startswith(b'{"id":'):
+                    board_id = int(data[6:data.index(b",")])
+                    boards[board_id] = offset
+                elif data.startswith(b'{"removed":'):
+                    board_id = json.loads(data)["removed"]
+                    if boards.pop(board_id, None) is not None:
+                        self.garbage += 1
+                    self.garbage += 1
+                else:
+                    # Older boards get the next id, and older removals name the position of the board
+                    legacy = True
+                    record = json.loads(data)
+                    if "board" in record:
+                        board_id = self.next_id
+                        boards[board_id] = offset
+                    else:
+                        board_id = -1
+                        if 0 <= record["remove"] < len(boards):
+                            boards.pop(list(boards)[record["remove"]])
+                self.next_id = max(self.next_id, board_id + 1)
+
+                offset += len(line)
+
+            # A crash while writing only damages the end, so nothing there ever made it to disk in one piece
+            if torn is not None:
+                file.truncate(torn)
+
+        # Give the boards of an older file their ids on disk, since they would get other ones once some are gone
+        if legacy:
+            with open(self.path, "rb") as old_file, open(self.path + ".tmp", "wb") as file:
+                for board_id, offset in boards.items():
+                    old_file.seek(offset)
+                    boards[board_id] = file.tell()
+                    file.write(encode_record({"id": board_id, "board": decode_record(old_file.readline())["board"]}))
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(self.path + ".tmp", self.path)
+            self.garbage = 0
+
+        self.offsets = list(boards.values())
+        self.ids = list(boards)
+
+    def write_records(self) -> None:
+        """ Writer thread loop: append every queued record to the file, compacting it when most of it is dead.
+        """
+
+        while True:
+            write = self.writes.get()
+            if write is None:
+                self.writes.task_done()
+                return
+
+            kind, value = write
+            if kind == "compact":
+                self.rewrite()
+            elif kind == "board":
+                self.append_board(value)
+            else:
+                self.append_removal(value)
+
+            if kind != "compact" and self.garbage > max(64, len(self.offsets)):
+                self.rewrite()
+
+            self.writes.task_done()
+
+    def append_line(self, line: bytes) -> int:
+        """ Append 'line' to the file, making sure it is on disk, and return where it starts.
+        """
+
+        with open(self.path, "ab") as file:
+            offset = file.tell()
+            file.write(line)
+            file.flush()
+            os.fsync(file.fileno())
+
+        return offset
+
+    def append_board(self, value: tuple[int, Board.Board]) -> None:
+        """ Append a record adding the board in 'value' under the id in 'value' and keep its offset instead of the board.
+        """
+
+        board_id, board = value
+        # The id goes first so opening the store can pick it out without reading the board
+        offset = self.append_line(encode_record({"id": board_id, "board": board.to_list()}))
+
+        with self.lock:
+            # The board may have moved down, or been removed, since it was queued
+            for i in range(len(self.offsets) - 1, -1, -1):
+                if self.offsets[i] is board:
+                    self.offsets[i] = offset
+                    self.loaded[i] = board
+                    break
+
+    def append_removal(self, board_id: int) -> None:
+        """ Append a record removing the board with id 'board_id'.
+        """
+
+        self.append_line(encode_record({"removed": board_id}))
+
+        with self.lock:
+            # Both the removed board's record and this one are dead
+            self.garbage += 2
+
+    def rewrite(self) -> None:
+        """ Replace the file with one holding only the boards still saved, in order.
+        The new file is written while the main thread keeps reading the old one, and only swapping them takes the lock.
+        """
+
+        with self.lock:
+            # Boards still waiting to be written are always the last ones. Removals not written yet are already
+            # gone, which is fine since their records name the board by id
+            offsets = [offset for offset in self.offsets if not isinstance(offset, Board.Board)]
+
+        # Only this thread writes, so the records behind 'offsets' stay put while they are copied
+        moved = {}
+        with open(self.path, "rb") as old_file, open(self.path + ".tmp", "wb") as file:
+            for offset in offsets:
+                old_file.seek(offset)
+                moved[offset] = file.tell()
+                file.write(old_file.readline())
+            file.flush()
+            os.fsync(file.fileno())
+
+        with self.lock:
+            os.replace(self.path + ".tmp", self.path)
+
+            # Boards removed in the meantime are gone from 'offsets', and their removals are written after this
+            self.offsets = [offset if isinstance(offset, Board.Board) else moved[offset] for offset in self.offsets]
+            self.garbage = 0
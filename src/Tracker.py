@@ -0,0 +1,98 @@
+class CapitalTracker:
+
+    board: list[list[int]]
+
+    rows: list[set[int]]
+    columns: list[set[int]]
+    cities: dict[int, set[tuple[int, int]]]
+
+    capitals: set[tuple[int, int]]
+    valid: set[tuple[int, int]]
+
+    def __init__(self, board: list[list[int]]) -> None:
+        """ Keep track of the capitals placed on 'board' by row, column and city,
+        so checking whether a capital breaks any rule never has to scan the board.
+        """
+
+        self.board = board
+
+        self.rows = [set() for _ in board]
+        self.columns = [set() for _ in board]
+        self.cities = {}
+
+        self.capitals = set()
+        self.valid = set()
+
+    def place(self, column: int, row: int) -> None:
+        """ Add a capital on 'column' and 'row'.
+        """
+
+        if (column, row) in self.capitals:
+            return
+
+        self.capitals.add((column, row))
+        self.rows[row].add(column)
+        self.columns[column].add(row)
+        self.cities.setdefault(self.board[row][column], set()).add((column, row))
+
+        self.update_around(column, row)
+
+
+    def remove(self, column: int, row: int) -> None:
+        """ Take away the capital on 'column' and 'row'.
+        """
+
+        if (column, row) not in self.capitals:
+            return
+
+        self.capitals.discard((column, row))
+        self.valid.discard((column, row))
+        self.rows[row].discard(column)
+        self.columns[column].discard(row)
+        self.cities[self.board[row][column]].discard((column, row))
+
+        self.update_around(column, row)
+
+
+    def is_valid(self, column: int, row: int) -> bool:
+        """ Returns True if no other capitals interfere with the capital on 'column' and 'row'.
+        """
+
+        # Row, column and city: The capital must be the only one
+
+        if (len(self.rows[row]) > 1 or len(self.columns[column]) > 1 or
+            len(self.cities[self.board[row][column]]) > 1):
+            return False
+
+        # Surrounding: No capitals can be touching, the rest of the neighbours share a row or column
+
+        for r in [-1, 1]:
+            for c in [-1, 1]:
+                if (column + c, row + r) in self.capitals:
+                    return False
+
+        return True
+
+
+    def update_around(self, column: int, row: int) -> None:
+        """ Check every capital whose validity can change when 'column' and 'row' changes again.
+        """
+
+        affected = {(column, row)}
+        affected.update((c, row) for c in self.rows[row])
+        affected.update((column, r) for r in self.columns[column])
+        affected.update(self.cities.get(self.board[row][column], ()))
+        affected.update((column + c, row + r) for r in [-1, 1] for c in [-1, 1])
+
+        for square in affected & self.capitals:
+            if self.is_valid(*square):
+                self.valid.add(square)
+            else:
+                self.valid.discard(square)
+
+
+    def is_solved(self) -> bool:
+        """ Returns True if every row holds a capital and none of them break a rule.
+        """
+
+        return len(self.valid) == len(self.board)